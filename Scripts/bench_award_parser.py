@@ -0,0 +1,115 @@
+"""
+Benchmark: parse_award_html rápido (lxml, solo wikitables) vs BeautifulSoup.
+
+Usa el HTML guardado de cada página de AWARD_PAGES en data/html_fixtures/
+(--save los baja una vez, vía cache). Verifica que ambos parsers den el
+mismo output fila por fila y reporta el tiempo medio por página.
+
+--check-cache compara además los dos parsers sobre todo el HTML de Wikipedia
+guardado en data/http_cache.sqlite (páginas reales, con TemplateStyles y
+demás): mismas celdas en cada fila de cada wikitable y, para las páginas de
+AWARD_PAGES, los mismos registros. Falla en la primera diferencia.
+
+Corre: python bench_award_parser.py [--save] [--repeat 5] [--check-cache]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from config import DATA_DIR, YEARS
+from fetch_awards_season import (
+    AWARD_PAGES, _LXML_OK, _clean, _iter_rows, _wiki_html, parse_award_html,
+)
+from http_cache import CACHE
+
+FIXTURES_DIR = Path(DATA_DIR) / "html_fixtures"
+
+
+def _fixture_path(award: str) -> Path:
+    return FIXTURES_DIR / f"{award}.html"
+
+
+def save_fixtures() -> None:
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for page in AWARD_PAGES:
+        _fixture_path(page.award).write_text(_wiki_html(page.url), encoding="utf-8")
+        print(f"  guardado {_fixture_path(page.award)}")
+
+
+def _time_parse(html: str, page, fast: bool, repeat: int) -> tuple[float, list[dict]]:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = parse_award_html(html, page.award, YEARS, page.year_offset, page.film_col, fast=fast)
+    return (time.perf_counter() - t0) / repeat * 1000, out
+
+
+def check_cache() -> None:
+    """Paridad lxml vs bs4 sobre las páginas de Wikipedia reales del cache HTTP."""
+    if not _LXML_OK:
+        raise SystemExit("lxml no está instalado (pip install lxml): no hay parser rápido que chequear")
+
+    pages = {page.url: page for page in AWARD_PAGES}
+    cached = CACHE.bodies("wiki")
+    if not cached:
+        print(f"  {CACHE.path}: sin HTML de Wikipedia cacheado (correr fetch_awards_season.py)")
+        return
+    for url, html in cached:
+        fast = [[_clean(c) for c in cells] for cells in _iter_rows(html, fast=True)]
+        slow = [[_clean(c) for c in cells] for cells in _iter_rows(html, fast=False)]
+        bad  = next((i for i, (a, b) in enumerate(zip(fast, slow)) if a != b), None)
+        assert len(fast) == len(slow), f"{url}: {len(fast)} filas con lxml vs {len(slow)} con bs4"
+        assert bad is None, f"{url}: fila {bad} difiere\n  lxml: {fast[bad]}\n  bs4 : {slow[bad]}"
+
+        n_records = ""
+        if url in pages:
+            page = pages[url]
+            args = (html, page.award, YEARS, page.year_offset, page.film_col)
+            fast_out = parse_award_html(*args, fast=True)
+            assert fast_out == parse_award_html(*args, fast=False), f"{page.award}: registros distintos"
+            n_records = f", {len(fast_out)} registros"
+        print(f"  ok {url} ({len(fast)} filas{n_records})")
+    print(f"  {len(cached)} páginas: lxml y bs4 coinciden")
+
+
+def main(repeat: int) -> None:
+    if not _LXML_OK:
+        raise SystemExit("lxml no está instalado (pip install lxml): no hay parser rápido que medir")
+
+    total_slow = total_fast = 0.0
+    print(f"{'premio':<20} {'KB':>6} {'filas':>6} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}")
+    for page in AWARD_PAGES:
+        path = _fixture_path(page.award)
+        if not path.exists():
+            print(f"{page.award:<20} sin fixture (correr con --save)")
+            continue
+        html = path.read_text(encoding="utf-8")
+
+        slow_ms, slow_out = _time_parse(html, page, fast=False, repeat=repeat)
+        fast_ms, fast_out = _time_parse(html, page, fast=True, repeat=repeat)
+        assert fast_out == slow_out, f"{page.award}: el parser rápido difiere del original"
+
+        total_slow += slow_ms
+        total_fast += fast_ms
+        print(f"{page.award:<20} {len(html) / 1024:6.0f} {len(fast_out):6d} "
+              f"{slow_ms:9.1f} {fast_ms:9.1f} {slow_ms / fast_ms:7.1f}x")
+
+    if total_fast:
+        print(f"{'TOTAL':<20} {'':>6} {'':>6} {total_slow:9.1f} {total_fast:9.1f} "
+              f"{total_slow / total_fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--save", action="store_true",
+                        help="bajar/actualizar los fixtures HTML antes de medir")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check-cache", action="store_true",
+                        help="chequear paridad sobre el HTML de Wikipedia del cache HTTP")
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures()
+    if args.check_cache:
+        check_cache()
+    main(args.repeat)
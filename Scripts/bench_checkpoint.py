@@ -0,0 +1,77 @@
+"""
+Chequeo + benchmark del checkpoint incremental (checkpoint.JsonlSink).
+
+Primero simula el resume tras un crash a mitad de write: un partial con
+registros completos y una última línea cortada (y uno que es solo una
+línea cortada). Al reabrir el sink y appendear, load_records tiene que
+devolver los registros viejos completos + los nuevos; el nuevo no puede
+quedar pegado a la línea rota.
+
+Después mide cuánto cuesta appendear --records registros según el
+batch_size (cada batch hace flush + fsync).
+
+Corre: python bench_checkpoint.py [--records 2000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from checkpoint import JsonlSink, load_records
+
+BATCH_SIZES = [1, 10, 50]
+
+
+def _record(i: int) -> dict:
+    return {"ceremony_year": 1978 + i % 49, "nominated_title": f"Film {i}", "tmdb_id": i}
+
+
+def check() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "01_tmdb.partial.jsonl"
+
+        with JsonlSink(path) as sink:
+            sink.append(_record(0))
+            sink.append(_record(1))
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write('{"ceremony_year": 1980, "nominated_title": "Fil')   # crash a mitad de write
+
+        with JsonlSink(path) as sink:
+            sink.append(_record(2))
+        got = [r["tmdb_id"] for r in load_records(path)]
+        assert got == [0, 1, 2], f"resume con cola truncada: {got}"
+
+        path.write_text('{"ceremony_year": 19', encoding="utf-8")   # solo la línea rota
+        with JsonlSink(path) as sink:
+            sink.append(_record(3))
+        got = [r["tmdb_id"] for r in load_records(path)]
+        assert got == [3], f"resume con partial sin líneas completas: {got}"
+
+        with JsonlSink(path) as sink:                                # partial sano: no se toca
+            sink.append(_record(4))
+        got = [r["tmdb_id"] for r in load_records(path)]
+        assert got == [3, 4], f"resume con partial sano: {got}"
+    print("check OK: resume tras línea truncada, partial roto entero, partial sano")
+
+
+def main(n_records: int) -> None:
+    check()
+    print(f"{'batch_size':>10} {'ms':>9} {'registros/s':>12}")
+    for batch_size in BATCH_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.partial.jsonl"
+            t0 = time.perf_counter()
+            with JsonlSink(path, batch_size=batch_size) as sink:
+                for i in range(n_records):
+                    sink.append(_record(i))
+            secs = time.perf_counter() - t0
+            assert len(load_records(path)) == n_records
+        print(f"{batch_size:>10} {secs * 1000:9.1f} {n_records / secs:12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.records)
@@ -0,0 +1,110 @@
+"""
+Benchmark + chequeo golden de engineer_features (vectorizado).
+
+El golden es fixtures/engineer_features_golden.json: inputs de un master
+sintético (synthetic_master(60): budgets en 0/NaN, fechas vacías, géneros
+que no son JSON, ...) y el output que daba la versión original con un
+apply por género, guardado una vez. Antes de medir se verifica que la
+versión actual lo reproduzca.
+
+Para medir usa data/master_dataset.csv si existe (columnas de entrada del
+merge) o un master sintético con la misma forma, replicado --scale veces.
+
+Corre: python bench_engineer_features.py [--scale 100] [--repeat 3]
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from config import DATA_DIR
+from build_master import CEREMONY_DATES, GENRE_COLS, engineer_features
+
+GOLDEN = Path(__file__).resolve().parent / "fixtures" / "engineer_features_golden.json"
+
+FEATURE_COLS = [
+    "budget_m", "revenue_m", "log_budget", "log_revenue", "roi", "log_imdb_votes",
+    "release_month", "is_q4_release", "is_english", "main_language",
+    "total_precursor_wins", "total_precursor_noms", "omdb_oscar_wins",
+    "days_to_ceremony", *GENRE_COLS, "main_genre",
+    "rt_norm", "imdb_norm", "metacritic_norm", "critic_composite",
+]
+
+
+def check_golden() -> None:
+    """
+    engineer_features sobre los inputs del fixture tiene que dar el output
+    guardado. Texto se compara como object (pandas 3 lo lee como str).
+    """
+    golden = pd.read_json(GOLDEN, orient="table")
+    out    = engineer_features(golden.drop(columns=FEATURE_COLS))
+    text   = {c: object for c in golden.select_dtypes(exclude=["number", "bool"]).columns}
+    pd.testing.assert_frame_equal(out.astype(text), golden.astype(text))
+    print(f"golden OK: {GOLDEN.name} ({len(golden)} filas x {golden.shape[1]} cols)")
+
+
+def synthetic_master(n: int = 315, seed: int = 0) -> pd.DataFrame:
+    rng    = random.Random(seed)
+    pool   = ["Drama", "Comedy", "History", "Romance", "War", "Crime", "Music",
+              "Science Fiction", "Animation", "Family", "Fantasy", "Documentary"]
+    awards = [None, "", "Nominated for 3 Oscars. 40 wins", "Won 2 Oscars. 80 wins & 150 nominations",
+              "Won 11 Oscars. 100 wins", "12 wins & 30 nominations"]
+    years  = sorted(CEREMONY_DATES)
+    rows = []
+    for i in range(n):
+        year = rng.choice(years)
+        rows.append({
+            "ceremony_year"  : year,
+            "nominated_title": f"Film {i}",
+            "budget"         : rng.choice([0, None, rng.randint(1, 200) * 1_000_000]),
+            "revenue"        : rng.choice([0, None, rng.randint(1, 900) * 1_000_000]),
+            "imdb_votes"     : rng.choice([None, rng.randint(1_000, 2_000_000)]),
+            "release_date"   : rng.choice([None, "", f"{year - 1}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"]),
+            "language"       : rng.choice([None, "English", "Korean, English", "French, German"]),
+            "omdb_awards"    : rng.choice(awards),
+            "genres"         : rng.choice([None, "", "[]", "not json",
+                                           json.dumps(rng.sample(pool, rng.randint(1, 4)))]),
+            "rt_score"       : rng.choice([None, rng.randint(40, 100)]),
+            "imdb_rating"    : rng.choice([None, round(rng.uniform(5, 9), 1)]),
+            "metacritic"     : rng.choice([None, rng.randint(40, 100)]),
+            "gg_drama_won"       : rng.randint(0, 1),
+            "gg_drama_nominated" : rng.randint(0, 1),
+            "bafta_won"          : rng.randint(0, 1),
+        })
+    return pd.DataFrame(rows)
+
+
+def _load_base() -> pd.DataFrame:
+    path = Path(DATA_DIR) / "master_dataset.csv"
+    if path.exists():
+        return pd.read_csv(path).drop(columns=FEATURE_COLS, errors="ignore")
+    return synthetic_master()
+
+
+def _time(fn, df: pd.DataFrame, repeat: int) -> tuple[float, pd.DataFrame]:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(df)
+    return (time.perf_counter() - t0) / repeat, out
+
+
+def main(scale: int, repeat: int) -> None:
+    check_golden()
+    base = _load_base()
+    print(f"{'filas':>8} {'s':>9} {'filas/s':>11}")
+    for factor in sorted({1, scale}):
+        df = pd.concat([base] * factor, ignore_index=True)
+        secs, _ = _time(engineer_features, df, repeat)
+        print(f"{len(df):8d} {secs:9.3f} {len(df) / secs:11,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="veces que se replica el master")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.scale, args.repeat)
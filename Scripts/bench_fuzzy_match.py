@@ -0,0 +1,151 @@
+"""
+Benchmark: fuzzy_match_films (cdist por bloque año/offset) vs el loop
+original con process.extractOne por título.
+
+Genera nominados y tablas de awards sintéticas (títulos reales de
+OSCAR_BEST_PICTURE con ruido: mayúsculas, artículos, typos, films que no
+matchean), verifica que ambas versiones den exactamente el mismo DataFrame
+y reporta tiempos hasta 10k filas de awards. La columna "blocked" es
+fuzzy_match_films(blocked=True) (title_match: normaliza y matchea más
+filas, así que no se compara fila a fila).
+
+--universe mide TitleMatcher solo, contra universos de títulos sintéticos
+(vocabulario Zipf, como un export de TMDB): ms por query y cuántas queries
+con un typo vuelven a su título de origen. El costo por query no debería
+crecer con el universo (title_match.MAX_POSTINGS acota el bloque).
+
+Corre: python bench_fuzzy_match.py [--sizes 500 2000 10000] [--workers -1]
+                                   [--universe 10000 100000 400000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+from nominees_ground_truth import OSCAR_BEST_PICTURE
+from build_master import fuzzy_match_films
+from title_match import TitleMatcher
+
+LOOP_MAX_ROWS = 10_000   # el loop original es cuadrático: arriba de esto se saltea
+
+
+def fuzzy_match_films_loop(left, right, threshold=82, year_slack=1):
+    """Implementación original (referencia para el chequeo de igualdad)."""
+    right = right.copy()
+    right["nominated_title"] = None
+
+    for year in sorted(left["ceremony_year"].astype(int).unique()):
+        left_titles = left.loc[left["ceremony_year"] == year, "nominated_title"].tolist()
+        if not left_titles:
+            continue
+        for dy in range(-year_slack, year_slack + 1):
+            mask = right["ceremony_year"].astype(int) == year + dy
+            unmatched_films = right.loc[mask & right["nominated_title"].isna(), "film"].tolist()
+            for r_title in unmatched_films:
+                result = process.extractOne(r_title, left_titles, scorer=fuzz.token_sort_ratio)
+                if result is None:
+                    continue
+                match, score, _ = result
+                if score >= threshold:
+                    idx = mask & (right["film"] == r_title)
+                    right.loc[idx, "nominated_title"] = match
+                    right.loc[idx, "ceremony_year"] = year
+    return right
+
+
+def _noisy(title: str, rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.3:
+        return title
+    if roll < 0.5:
+        return title.upper()
+    if roll < 0.65:
+        return title.removeprefix("The ") if title.startswith("The ") else "The " + title
+    if roll < 0.85 and len(title) > 4:
+        i = rng.randrange(len(title))
+        return title[:i] + rng.choice("aeiourst") + title[i + 1:]
+    return f"Unrelated Film {rng.randrange(10**6)}"
+
+
+def synthetic_awards(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        year, title, _ = OSCAR_BEST_PICTURE[i % len(OSCAR_BEST_PICTURE)]
+        rows.append({
+            "ceremony_year": year + rng.choice([-1, 0, 0, 0, 1]),
+            "film"         : _noisy(title, rng) + (f" ({i})" if i >= len(OSCAR_BEST_PICTURE) else ""),
+            "gg_drama_won" : rng.randint(0, 1),
+        })
+    return pd.DataFrame(rows)
+
+
+def _time(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def synthetic_universe(n_titles: int, seed: int = 0) -> list[str]:
+    """Títulos de 1-5 palabras con frecuencias Zipf (' the', 'love', ... muy comunes)."""
+    rng   = np.random.default_rng(seed)
+    vocab = [w.lower() for _, title, _ in OSCAR_BEST_PICTURE for w in title.split()]
+    vocab = list(dict.fromkeys(vocab)) + [
+        "".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), rng.integers(2, 10)))
+        for _ in range(60_000)
+    ]
+    p = 1 / np.arange(1, len(vocab) + 1) ** 1.1
+    words = rng.choice(len(vocab), size=(n_titles, 5), p=p / p.sum())
+    lens  = rng.integers(1, 6, n_titles)
+    return [" ".join(vocab[w] for w in words[i, :lens[i]]) for i in range(n_titles)]
+
+
+def matcher_scaling(universe: list[int], n_queries: int = 500) -> None:
+    rng = random.Random(0)
+    print(f"{'títulos':>9} {'índice s':>9} {'ms/query':>9} {'recuperadas':>12}")
+    for n in universe:
+        titles = synthetic_universe(n)
+        source = rng.sample(range(n), n_queries)
+        typo   = [rng.randrange(len(titles[i])) for i in source]
+        queries = [titles[i][:j] + "x" + titles[i][j + 1:] for i, j in zip(source, typo)]
+
+        build_s, matcher = _time(TitleMatcher, titles)
+        query_s, found   = _time(matcher.match_many, queries)
+        back = sum(f is not None and matcher.keys[f[0]] == matcher.keys[i]
+                   for f, i in zip(found, source))
+        print(f"{n:9d} {build_s:9.2f} {query_s / n_queries * 1000:9.2f} {back:7d}/{n_queries}")
+
+
+def main(sizes: list[int], workers: int) -> None:
+    left = pd.DataFrame(OSCAR_BEST_PICTURE, columns=["ceremony_year", "nominated_title", "won"])
+
+    print(f"{'filas':>7} {'loop s':>9} {'cdist s':>9} {'speedup':>8} {'matcheadas':>11} "
+          f"{'blocked s':>10} {'matcheadas':>11}")
+    for n in sizes:
+        right = synthetic_awards(n)
+        fast_s, fast = _time(fuzzy_match_films, left, right, workers=workers)
+        block_s, block = _time(fuzzy_match_films, left, right, blocked=True)
+        matched = int(fast["nominated_title"].notna().sum())
+        tail    = f"{block_s:10.3f} {int(block['nominated_title'].notna().sum()):11d}"
+        if n > LOOP_MAX_ROWS:
+            print(f"{n:7d} {'—':>9} {fast_s:9.3f} {'':>8} {matched:11d} {tail}")
+            continue
+        slow_s, slow = _time(fuzzy_match_films_loop, left, right)
+        pd.testing.assert_frame_equal(fast, slow)
+        print(f"{n:7d} {slow_s:9.3f} {fast_s:9.3f} {slow_s / fast_s:7.1f}x {matched:11d} {tail}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10_000])
+    parser.add_argument("--workers", type=int, default=1, help="-1 = todos los cores")
+    parser.add_argument("--universe", type=int, nargs="*", default=[],
+                        help="tamaños de universo para medir TitleMatcher solo")
+    args = parser.parse_args()
+    main(args.sizes, args.workers)
+    if args.universe:
+        matcher_scaling(args.universe)
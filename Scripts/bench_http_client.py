@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: requests.get suelto vs sesión compartida (http_client).
+
+Levanta un stub HTTP/1.1 keep-alive en localhost y mide la latencia media
+por request de cada variante. En localhost solo se ahorra el handshake TCP;
+contra TMDB/OMDB/Wikipedia se suma el TLS, así que la diferencia real es mayor.
+
+Corre: python bench_http_client.py [--n 500]
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import http_client
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    disable_nagle_algorithm = True  # headers y body van en writes separados
+
+    def do_GET(self):
+        body = b'{"results": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _time_per_request(get, url: str, n: int) -> float:
+    get(url)   # warm-up
+    t0 = time.perf_counter()
+    for i in range(n):
+        get(url, params={"query": f"film {i}"}).raise_for_status()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def main(n: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/3/search/movie"
+
+    try:
+        bare   = _time_per_request(lambda u, **kw: requests.get(u, timeout=10, **kw), url, n)
+        pooled = _time_per_request(http_client.http_get, url, n)
+    finally:
+        http_client.close()
+        server.shutdown()
+
+    print(f"{'requests.get suelto':<24} {bare:8.3f} ms/request")
+    print(f"{'sesión compartida':<24} {pooled:8.3f} ms/request")
+    print(f"{'ahorro':<24} {bare - pooled:8.3f} ms/request  ({bare / pooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=500, help="requests por variante")
+    main(parser.parse_args().n)
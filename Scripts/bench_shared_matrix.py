@@ -0,0 +1,81 @@
+"""
+Benchmark: matriz de entrenamiento por pickle vs shared_matrix, con N workers.
+
+Cada worker recibe X (float32, --rows x --cols) y hace una pasada que toca
+todas las páginas (la suma por columna, como haría un fit). Se mide el
+arranque (initializer + primera pasada) y la memoria privada de cada worker
+(Private_* de /proc/self/smaps_rollup): con pickle crece con X en cada
+worker; con shared memory las páginas son del bloque compartido.
+
+Corre: python bench_shared_matrix.py [--rows 200000] [--cols 40] [--workers 1 2 4]
+"""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from shared_matrix import SharedMatrix, init_worker, worker_matrix
+
+_X = None
+
+
+def _private_mb() -> float:
+    """Memoria privada del proceso (Linux); 0 si no hay smaps_rollup."""
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            kb = sum(int(line.split()[1]) for line in fh if line.startswith("Private_"))
+    except OSError:
+        return 0.0
+    return kb / 1024
+
+
+def _init_pickled(X: np.ndarray, t0: float) -> None:
+    global _X, _T0
+    _X, _T0 = X, t0
+
+
+def _init_shared(handle, t0: float) -> None:
+    global _X, _T0
+    init_worker(handle)
+    _X, _T0 = worker_matrix()[0], t0
+
+
+def _probe(_) -> tuple[float, float, float]:
+    checksum = float(_X.sum(axis=0, dtype=np.float64).sum())
+    return time.perf_counter() - _T0, _private_mb(), checksum
+
+
+def _run(n_workers: int, init, initargs) -> tuple[float, float, float]:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(n_workers, initializer=init, initargs=initargs) as pool:
+        # un probe por worker (chunksize=1 y una tarea por proceso)
+        results = pool.map(_probe, range(n_workers), chunksize=1)
+    ready = max(r[0] for r in results)
+    mem   = max(r[1] for r in results)
+    return ready, mem, results[0][2]
+
+
+def main(rows: int, cols: int, workers: list[int]) -> None:
+    rng = np.random.default_rng(0)
+    X   = rng.standard_normal((rows, cols), dtype=np.float32)
+    y   = rng.integers(0, 2, rows).astype(np.int8)
+    print(f"X: {rows} x {cols} float32 = {X.nbytes / 2**20:.1f} MB")
+    print(f"{'workers':>7} {'pickle s':>9} {'pickle MB':>10} {'shared s':>9} {'shared MB':>10}")
+
+    with SharedMatrix.publish(X, y) as shared:
+        for n in workers:
+            p_s, p_mb, p_sum = _run(n, _init_pickled, (X, time.perf_counter()))
+            s_s, s_mb, s_sum = _run(n, _init_shared, (shared.handle, time.perf_counter()))
+            assert np.isclose(p_sum, s_sum)
+            print(f"{n:7d} {p_s:9.3f} {p_mb:10.1f} {s_s:9.3f} {s_mb:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cols", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    main(args.rows, args.cols, args.workers)
@@ -0,0 +1,111 @@
+"""
+Chequeo + benchmark del índice local de títulos (title_index).
+
+Primero arma un índice desde un export sintético chico (unas líneas de
+JSONL gzippeado, mismo formato que movie_ids_*.json.gz) y verifica que
+resolve() y resolve_many() den lo esperado: hit único, miss, título
+compartido donde uno domina por popularidad, título ambiguo, y films
+adult/video salteados.
+
+Después mide build_index y resolve_many sobre un export sintético de
+--films películas, con los nominados de OSCAR_BEST_PICTURE mezclados.
+
+Corre: python bench_title_index.py [--films 1000000] [--queries 10000]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from nominees_ground_truth import OSCAR_BEST_PICTURE
+from title_index import TitleIndex, build_index
+
+CHECK_DUMP = [
+    {"id": 1,  "original_title": "Parasite",         "popularity": 50.0},
+    {"id": 2,  "original_title": "The Brutalist",    "popularity": 30.0},
+    {"id": 10, "original_title": "Crash",            "popularity": 80.0},
+    {"id": 11, "original_title": "CRASH",            "popularity": 2.0},
+    {"id": 12, "original_title": "Crash!",           "popularity": 1.0},
+    {"id": 20, "original_title": "Heat",             "popularity": 10.0},
+    {"id": 21, "original_title": "Heat",             "popularity": 9.0},
+    {"id": 30, "original_title": "Anora",            "popularity": 90.0, "adult": True},
+    {"id": 31, "original_title": "Oppenheimer",      "popularity": 70.0, "video": True},
+]
+
+CHECK_EXPECTED = {
+    "Parasite"       : 1,      # un solo candidato
+    "Brutalist, The" : 2,      # mismo título normalizado
+    "Crash"          : 10,     # tres candidatos, 80 >= DOMINANCE x 2
+    "Heat"           : None,   # dos candidatos parejos → API
+    "Anora"          : None,   # adult: no se indexa
+    "Oppenheimer"    : None,   # video: no se indexa
+    "Unknown Film"   : None,   # miss
+}
+
+
+def write_dump(path: Path, records) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps({"adult": False, "video": False, **rec}) + "\n")
+
+
+def check() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_dump(tmp / "movie_ids.json.gz", CHECK_DUMP)
+        assert build_index(tmp / "movie_ids.json.gz", tmp / "index") == 7
+
+        index = TitleIndex(tmp / "index")
+        assert [i for i, _ in index.candidates("crash")] == [10, 11, 12]
+        for title, expected in CHECK_EXPECTED.items():
+            assert index.resolve(title) == expected, f"resolve({title!r}) = {index.resolve(title)}"
+        many = index.resolve_many(list(CHECK_EXPECTED))
+        assert many == list(CHECK_EXPECTED.values()), f"resolve_many = {many}"
+
+        assert TitleIndex(tmp / "no_index").resolve_many(["Parasite"]) == [None]
+    print(f"check OK: {len(CHECK_EXPECTED)} títulos (hit, miss, dominante, ambiguo, adult/video)")
+
+
+def synthetic_export(n_films: int, seed: int = 0):
+    rng   = random.Random(seed)
+    words = list({w for _, title, _ in OSCAR_BEST_PICTURE for w in title.split()})
+    for i, (_, title, _) in enumerate(OSCAR_BEST_PICTURE):
+        yield {"id": i + 1, "original_title": title, "popularity": rng.uniform(5, 100)}
+    for i in range(len(OSCAR_BEST_PICTURE), n_films):
+        title = " ".join(rng.sample(words, rng.randint(1, 4))) + f" {rng.randrange(10**6)}"
+        yield {"id": i + 1, "original_title": title, "popularity": rng.expovariate(1.0)}
+
+
+def main(n_films: int, n_queries: int) -> None:
+    check()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp  = Path(tmp)
+        dump = tmp / "movie_ids.json.gz"
+        write_dump(dump, synthetic_export(n_films))
+
+        t0 = time.perf_counter()
+        build_index(dump, tmp / "index")
+        build_s = time.perf_counter() - t0
+
+        index   = TitleIndex(tmp / "index")
+        nominees = [title for _, title, _ in OSCAR_BEST_PICTURE]
+        queries  = (nominees * (n_queries // len(nominees) + 1))[:n_queries]
+        t0 = time.perf_counter()
+        resolved = index.resolve_many(queries)
+        query_ms = (time.perf_counter() - t0) * 1000
+
+    hits = sum(r is not None for r in resolved[:len(nominees)])
+    print(f"{n_films} films: índice en {build_s:.1f} s; {len(queries)} títulos en "
+          f"{query_ms:.1f} ms ({hits}/{len(nominees)} nominados resueltos sin API)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--films", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.films, args.queries)
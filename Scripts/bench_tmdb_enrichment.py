@@ -0,0 +1,105 @@
+"""
+Benchmark: enriquecimiento TMDB con un request por sub-recurso vs un solo
+request con append_to_response (DETAILS_APPEND).
+
+  antes  : movie/{id}?append_to_response=credits + external_ids, keywords,
+           release_dates y reviews por separado → 5 requests por film
+  después: movie/{id}?append_to_response=credits,external_ids,keywords,... → 1
+
+Contra la API real (TMDB_API_KEY, ids de data/01_tmdb.csv) o contra un stub
+local con latencia simulada (--stub-latency-ms). Saltea el cache de respuestas.
+
+Corre: python bench_tmdb_enrichment.py [--n 20] [--stub-latency-ms 80]
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+import http_client
+from config import DATA_DIR, TMDB_API_KEY
+from fetch_tmdb import BASE_URL, DETAILS_APPEND
+
+SEPARATE = [sub for sub in DETAILS_APPEND if sub != "credits"]
+
+
+def _stub_server(latency_s: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency_s)
+            body = b'{"id": 1}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _run(base_url: str, tmdb_ids: list[int], consolidated: bool) -> tuple[int, float]:
+    n_requests = 0
+
+    def get(path: str, **params) -> None:
+        nonlocal n_requests
+        n_requests += 1
+        resp = http_client.http_get(f"{base_url}/{path}",
+                                    params={"api_key": TMDB_API_KEY, **params})
+        resp.raise_for_status()
+
+    t0 = time.perf_counter()
+    for tmdb_id in tmdb_ids:
+        if consolidated:
+            get(f"movie/{tmdb_id}", append_to_response=",".join(DETAILS_APPEND))
+        else:
+            get(f"movie/{tmdb_id}", append_to_response="credits")
+            for sub in SEPARATE:
+                get(f"movie/{tmdb_id}/{sub}")
+    return n_requests, time.perf_counter() - t0
+
+
+def main(n: int, stub_latency_ms: float | None) -> None:
+    server = None
+    if stub_latency_ms is not None:
+        server   = _stub_server(stub_latency_ms / 1000)
+        base_url = f"http://127.0.0.1:{server.server_port}/3"
+        tmdb_ids = list(range(1, n + 1))
+    else:
+        base_url = BASE_URL
+        tmdb_df  = pd.read_csv(Path(DATA_DIR) / "01_tmdb.csv")
+        tmdb_ids = tmdb_df["tmdb_id"].dropna().astype(int).head(n).tolist()
+
+    try:
+        before = _run(base_url, tmdb_ids, consolidated=False)
+        after  = _run(base_url, tmdb_ids, consolidated=True)
+    finally:
+        http_client.close()
+        if server:
+            server.shutdown()
+
+    print(f"{len(tmdb_ids)} films — {'stub ' + str(stub_latency_ms) + ' ms' if server else 'API real'}")
+    print(f"{'':<30} {'requests':>9} {'wall s':>8} {'req/film':>9}")
+    for label, (reqs, secs) in [("antes (por sub-recurso)", before), ("después (append_to_response)", after)]:
+        print(f"{label:<30} {reqs:9d} {secs:8.2f} {reqs / len(tmdb_ids):9.1f}")
+    print(f"ahorro: {before[0] - after[0]} requests, {before[1] / after[1]:.1f}x wall time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20, help="films a enriquecer")
+    parser.add_argument("--stub-latency-ms", type=float, default=None,
+                        help="usar un stub local con esta latencia en vez de la API real")
+    args = parser.parse_args()
+    main(args.n, args.stub_latency_ms)
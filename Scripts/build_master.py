@@ -3,12 +3,20 @@ Step 4 — Merge all sources into master dataset
 Joins: 01_tmdb + 02_omdb + 03_awards_season
 Adds: engineered features ready for modeling
 
-Output: data/master_dataset.csv
+Incremental: con el master anterior y data/master_state.json (hashes de
+contenido por key), solo se recalculan las keys cuyas filas cambiaron.
+`--full` fuerza el build completo.
+
+Output: data/master_dataset.parquet (+ .csv), vía storage.save_table
+        data/master_state.json, data/master_diff.json (filas/columnas cambiadas)
 """
 
-import re
+import argparse
+import hashlib
 import json
 import logging
+import os
+import time
 from pathlib import Path
 
 import pandas as pd
@@ -17,8 +25,12 @@ from rapidfuzz import process, fuzz   # pip install rapidfuzz
 
 try:
     from config import DATA_DIR
+    from storage import apply_schema, load_table, row_hashes, save_table, table_exists
+    from title_match import TitleMatcher
 except ImportError:
     from Scripts.config import DATA_DIR
+    from Scripts.storage import apply_schema, load_table, row_hashes, save_table, table_exists
+    from Scripts.title_match import TitleMatcher
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
@@ -85,42 +97,147 @@ def fuzzy_match_films(
     right: pd.DataFrame,
     threshold: int = 82,
     year_slack: int = 1,
+    workers: int = 1,
+    blocked: bool = False,
 ) -> pd.DataFrame:
+    """
+    Empareja cada `film` de awards (right) con un nominated_title de `left`
+    del mismo año ±year_slack. Una matriz de scores (process.cdist) por bloque
+    (año, offset) y argmax vectorizado; workers=-1 usa todos los cores.
+
+    blocked=True usa title_match.TitleMatcher (títulos normalizados, match
+    exacto primero, fuzzy solo dentro del bloque de n-gramas): para listas
+    de precursores con miles de films por temporada.
+    """
+    if blocked:
+        return _fuzzy_match_blocked(left, right, threshold, year_slack)
+
     right = right.copy()
-    right["nominated_title"] = None
+    films   = right["film"].to_numpy(dtype=object)
+    r_years = right["ceremony_year"].astype(int).to_numpy(copy=True)
+    titles  = np.full(len(right), None, dtype=object)
     matched_count = 0
 
-    for year in sorted(left["ceremony_year"].astype(int).unique()):
-        left_titles = left.loc[left["ceremony_year"] == year, "nominated_title"].tolist()
-        if not left_titles:
+    left_years  = left["ceremony_year"].astype(int).to_numpy()
+    left_titles = left["nominated_title"].to_numpy(dtype=object)
+
+    for year in sorted(np.unique(left_years)):
+        year_titles = left_titles[left_years == year].tolist()
+        if not year_titles:
             continue
 
         for dy in range(-year_slack, year_slack + 1):
-            search_year = year + dy
-            mask = right["ceremony_year"].astype(int) == search_year
-            unmatched_films = right.loc[mask & right["nominated_title"].isna(), "film"].tolist()
-
-            for r_title in unmatched_films:
-                result = process.extractOne(r_title, left_titles, scorer=fuzz.token_sort_ratio)
-                if result is None:
-                    continue
-                match, score, _ = result
-                if score >= threshold:
-                    idx = mask & (right["film"] == r_title)
-                    right.loc[idx, "nominated_title"] = match
-                    right.loc[idx, "ceremony_year"] = year
-                    matched_count += 1
+            mask      = r_years == year + dy
+            unmatched = films[mask & pd.isna(titles)]
+            queries   = pd.unique(unmatched[[isinstance(f, str) for f in unmatched]])
+            if len(queries) == 0:
+                continue
+
+            scores = process.cdist(queries, year_titles, scorer=fuzz.token_sort_ratio,
+                                   dtype=np.float64, workers=workers)
+            best   = scores.argmax(axis=1)
+            ok     = scores[np.arange(len(queries)), best] >= threshold
+            if not ok.any():
+                continue
+
+            match_of = dict(zip(queries[ok], np.asarray(year_titles, dtype=object)[best[ok]]))
+            idx = mask & pd.Series(films).isin(match_of).to_numpy()
+            titles[idx]  = [match_of[f] for f in films[idx]]
+            r_years[idx] = year
+            matched_count += int(pd.Series(unmatched).isin(match_of).sum())
+
+    moved = r_years != right["ceremony_year"].astype(int).to_numpy()
+    right.loc[moved, "ceremony_year"] = r_years[moved]
+    right["nominated_title"] = pd.Series(titles, index=right.index, dtype=object)
 
     log.info(f"fuzzy_match_films: {matched_count} filas de awards emparejadas")
     return right
 
 
+def _fuzzy_match_blocked(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    threshold: int,
+    year_slack: int,
+) -> pd.DataFrame:
+    """Cada film toma el mejor nominado a ±year_slack (empate → año más cercano)."""
+    right   = right.copy()
+    matcher = TitleMatcher(left["nominated_title"].tolist(),
+                           groups=left["ceremony_year"].astype(int).tolist())
+
+    pairs   = right[["film", "ceremony_year"]].drop_duplicates()
+    pairs   = pairs[pairs["film"].map(lambda f: isinstance(f, str))]
+    results = matcher.match_many(pairs["film"].tolist(), threshold,
+                                 groups=pairs["ceremony_year"].astype(int).tolist(),
+                                 slack=year_slack)
+    hits = {
+        (film, year): (matcher.titles[res[0]], int(matcher.groups[res[0]]))
+        for film, year, res in zip(pairs["film"], pairs["ceremony_year"], results)
+        if res is not None
+    }
+
+    found = [hits.get(k) for k in zip(right["film"], right["ceremony_year"])]
+    right["ceremony_year"]   = [f[1] if f else y for f, y in zip(found, right["ceremony_year"])]
+    right["nominated_title"] = pd.Series([f[0] if f else None for f in found],
+                                         index=right.index, dtype=object)
+
+    log.info(f"fuzzy_match_films (blocked): {sum(f is not None for f in found)} filas de awards emparejadas")
+    return right
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Feature engineering
 # ─────────────────────────────────────────────────────────────────────────────
 
+TOP_GENRES = [
+    "Drama", "Comedy", "Biography", "History", "Romance",
+    "Thriller", "War", "Crime", "Music", "Adventure",
+    "Mystery", "Western", "Science Fiction",
+]
+GENRE_COLS = ["genre_" + g.lower().replace(" ", "_") for g in TOP_GENRES]
+
+_OSCAR_WINS_RE = r"Won (\d+) Oscar"
+
+
+def _parse_genres(genres_json) -> list:
+    if isinstance(genres_json, (list, tuple)):
+        return list(genres_json)
+    if not isinstance(genres_json, str) or not genres_json:
+        return []
+    try:
+        genres = json.loads(genres_json)
+    except ValueError:
+        return []
+    return genres if isinstance(genres, list) else []
+
+
+def _genre_features(genres: pd.Series) -> tuple[np.ndarray, pd.Series]:
+    """
+    Multi-hot (n x TOP_GENRES) en una pasada + main_genre: el primer
+    TOP_GENRE presente, si no el primer género del film, si no 'Unknown'.
+    El JSON se parsea una vez por string distinto (factorize), no por fila.
+    """
+    # desde Parquet los géneros ya vienen como listas: tuplas para poder factorizar
+    codes, uniques = pd.factorize(genres.map(lambda g: tuple(g) if isinstance(g, list) else g))
+    parsed   = pd.Series([_parse_genres(g) for g in uniques] + [[]])   # último = NaN (code -1)
+    exploded = parsed.explode()
+    g_codes  = pd.Categorical(exploded, categories=TOP_GENRES).codes
+    rows     = exploded.index.to_numpy()
+
+    onehot = np.zeros((len(parsed), len(TOP_GENRES)), dtype=np.int64)
+    onehot[rows[g_codes >= 0], g_codes[g_codes >= 0]] = 1
+
+    first_any = exploded.groupby(level=0).first().reindex(parsed.index)
+    main = np.where(onehot.any(axis=1),
+                    np.asarray(TOP_GENRES, dtype=object)[onehot.argmax(axis=1)],
+                    first_any.fillna("Unknown").to_numpy(dtype=object))
+    return onehot[codes], pd.Series(main[codes], index=genres.index)
+
+
 def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Features del master en una pasada vectorizada (fechas y géneros se parsean una vez)."""
     df = df.copy()
+    release_dt = pd.to_datetime(df["release_date"], errors="coerce")
 
     # ── Budget & Revenue (millones, log) ──────────────────────────────────
     df["budget_m"]    = pd.to_numeric(df["budget"], errors="coerce").replace(0, np.nan) / 1e6
@@ -133,12 +250,14 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     df["log_imdb_votes"] = np.log1p(pd.to_numeric(df["imdb_votes"], errors="coerce"))
 
     # ── Release month ─────────────────────────────────────────────────────
-    df["release_month"] = pd.to_datetime(df["release_date"], errors="coerce").dt.month
+    df["release_month"] = release_dt.dt.month
     df["is_q4_release"] = df["release_month"].isin([10, 11, 12]).astype(int)
 
     # ── Idioma ────────────────────────────────────────────────────────────
     df["is_english"]    = df["language"].str.contains("English", na=False).astype(int)
-    df["main_language"] = df["language"].str.split(",").str[0].str.strip()
+    # .str no funciona sobre una columna toda NaN (p.ej. un build incremental de un solo film)
+    lang = df["language"]
+    df["main_language"] = lang.str.split(",").str[0].str.strip() if lang.notna().any() else lang
 
     # ── Awards season: total wins / noms ─────────────────────────────────
     award_won_cols = [c for c in df.columns if c.endswith("_won") and c != "won_best_picture"]
@@ -147,47 +266,17 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     df["total_precursor_noms"] = df[award_nom_cols].sum(axis=1) if award_nom_cols else 0
 
     # ── Oscar wins desde texto OMDB ───────────────────────────────────────
-    def _extract_oscar_wins(text) -> int:
-        if not text or pd.isna(text):
-            return 0
-        m = re.search(r"Won (\d+) Oscar", str(text))
-        return int(m.group(1)) if m else 0
-
-    df["omdb_oscar_wins"] = df["omdb_awards"].apply(_extract_oscar_wins)
+    wins = df["omdb_awards"].astype("string").str.extract(_OSCAR_WINS_RE, expand=False)
+    df["omdb_oscar_wins"] = pd.to_numeric(wins).fillna(0).astype(int)
 
     # ── Días entre estreno y ceremonia ────────────────────────────────────
-    release_dt  = pd.to_datetime(df["release_date"], errors="coerce")
     ceremony_dt = pd.to_datetime(df["ceremony_year"].map(CEREMONY_DATES), errors="coerce")
     df["days_to_ceremony"] = (ceremony_dt - release_dt).dt.days
 
     # ── Genre flags ───────────────────────────────────────────────────────
-    TOP_GENRES = [
-        "Drama", "Comedy", "Biography", "History", "Romance",
-        "Thriller", "War", "Crime", "Music", "Adventure",
-        "Mystery", "Western", "Science Fiction",
-    ]
-
-    def _parse_genres(genres_json) -> list:
-        if not genres_json or pd.isna(genres_json):
-            return []
-        try:
-            return json.loads(genres_json)
-        except Exception:
-            return []
-
-    parsed = df["genres"].apply(_parse_genres)
-
-    for genre in TOP_GENRES:
-        col = "genre_" + genre.lower().replace(" ", "_")
-        df[col] = parsed.apply(lambda gs, g=genre: int(g in gs))
-
-    def _main_genre(gs: list) -> str:
-        for g in TOP_GENRES:
-            if g in gs:
-                return g
-        return gs[0] if gs else "Unknown"
-
-    df["main_genre"] = parsed.apply(_main_genre)
+    onehot, main_genre = _genre_features(df["genres"])
+    df[GENRE_COLS]   = onehot
+    df["main_genre"] = main_genre
 
     # ── Critic composite ──────────────────────────────────────────────────
     df["rt_norm"]         = pd.to_numeric(df["rt_score"], errors="coerce")
@@ -199,64 +288,252 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  Main
+#  Merge de fuentes + premios → master
 # ─────────────────────────────────────────────────────────────────────────────
 
-def build_master() -> pd.DataFrame:
-    data_dir = Path(DATA_DIR)
-
-    tmdb_df   = pd.read_csv(data_dir / "01_tmdb.csv")
-    omdb_df   = pd.read_csv(data_dir / "02_omdb.csv")
-    awards_df = pd.read_csv(data_dir / "03_awards_season.csv")
+KEY = ["ceremony_year", "nominated_title"]
 
-    log.info(f"Shapes: TMDB={tmdb_df.shape}, OMDB={omdb_df.shape}, Awards={awards_df.shape}")
 
-    # ── Merge TMDB + OMDB ─────────────────────────────────────────────────
+def merge_sources(tmdb_df: pd.DataFrame, omdb_df: pd.DataFrame) -> pd.DataFrame:
+    """TMDB + OMDB por (ceremony_year, nominated_title), con un solo imdb_id."""
     df = tmdb_df.merge(
         omdb_df,
-        on=["ceremony_year", "nominated_title"],
+        on=KEY,
         how="left",
         suffixes=("_tmdb", "_omdb"),
     )
-    log.info(f"Tras merge TMDB+OMDB: {df.shape}")
+    # imdb_id viene de ambos lados (TMDB external_ids + OMDB): una sola columna
+    if "imdb_id_tmdb" in df.columns:
+        df["imdb_id"] = df["imdb_id_omdb"].fillna(df["imdb_id_tmdb"])
+        df = df.drop(columns=["imdb_id_tmdb", "imdb_id_omdb"])
+    return df
+
 
-    # ── Fuzzy merge awards season ─────────────────────────────────────────
-    awards_matched = fuzzy_match_films(df, awards_df)
+def match_awards(nominees: pd.DataFrame, awards_df: pd.DataFrame) -> pd.DataFrame:
+    """Una fila por nominado matcheado con el max de cada columna *_won / *_nominated."""
+    awards_matched = fuzzy_match_films(nominees, awards_df)
     awards_matched = awards_matched.dropna(subset=["nominated_title"])
     awards_matched = awards_matched.drop(columns=["film"])
 
     # Deduplicar: si un film matcheó desde varios años, quedarse con el max
     award_cols_aw = [c for c in awards_matched.columns
                      if c.endswith("_won") or c.endswith("_nominated")]
-    awards_matched = awards_matched.groupby(
-        ["ceremony_year", "nominated_title"], as_index=False
-    )[award_cols_aw].max()
+    return awards_matched.groupby(KEY, as_index=False)[award_cols_aw].max()
 
-    df = df.merge(
-        awards_matched,
-        on=["ceremony_year", "nominated_title"],
-        how="left",
-    )
-    log.info(f"Tras merge awards: {df.shape}")
 
-    # ── Fill NaN award cols con 0 ─────────────────────────────────────────
+def assemble(df: pd.DataFrame, awards: pd.DataFrame) -> pd.DataFrame:
+    """Pega los premios (0 donde no hubo match) y calcula las features."""
+    df = df.merge(awards, on=KEY, how="left")
     award_cols = [c for c in df.columns if c.endswith("_won") or c.endswith("_nominated")]
     df[award_cols] = df[award_cols].fillna(0).astype(int)
+    # tipos del schema: un subconjunto de keys puede traer columnas enteras en NaN
+    return engineer_features(apply_schema(df, "master_dataset"))
 
-    # ── Feature engineering ───────────────────────────────────────────────
-    df = engineer_features(df)
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Build incremental: hashes de contenido por key + master anterior
+# ─────────────────────────────────────────────────────────────────────────────
+
+MASTER_VERSION = 1   # subir al cambiar merge_sources / assemble / engineer_features
+STATE_FILE     = "master_state.json"
+DIFF_FILE      = "master_diff.json"
+
+
+def _key_hashes(df: pd.DataFrame, table: str) -> dict[tuple, str]:
+    """(ceremony_year, nominated_title) → hashes hex de sus filas, en orden."""
+    out: dict[tuple, str] = {}
+    for key, h in zip(zip(df["ceremony_year"], df["nominated_title"]), row_hashes(df, table)):
+        out[key] = out.get(key, "") + f"{h:016x}"
+    return out
+
+
+def _digest(parts) -> str:
+    return hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _input_state(tmdb_df: pd.DataFrame, omdb_df: pd.DataFrame, awards_df: pd.DataFrame) -> dict:
+    """Firma de columnas, orden de keys, hash por key (TMDB+OMDB) y por año de awards."""
+    tmdb_h, omdb_h = _key_hashes(tmdb_df, "01_tmdb"), _key_hashes(omdb_df, "02_omdb")
+    aw_hex = pd.Series([f"{h:016x}" for h in row_hashes(awards_df, "03_awards_season")],
+                       index=awards_df.index, dtype=object)
+    return {
+        "signature": _digest([MASTER_VERSION,
+                              *(f"{c}:{t}" for d in (tmdb_df, omdb_df, awards_df)
+                                for c, t in d.dtypes.items())]),
+        "keys"     : _digest(zip(tmdb_df["ceremony_year"], tmdb_df["nominated_title"])),
+        "rows"     : {k: h + ":" + omdb_h.get(k, "") for k, h in tmdb_h.items()},
+        "awards_years": {
+            int(y): _digest(sorted(g)) for y, g in aw_hex.groupby(awards_df["ceremony_year"])
+        },
+    }
+
+
+def _awards_hashes(awards: pd.DataFrame) -> dict[tuple, str]:
+    return _key_hashes(awards, "master_dataset") if len(awards) else {}
+
+
+def _load_state(data_dir: Path) -> dict | None:
+    path = data_dir / STATE_FILE
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text(encoding="utf-8"))
+    state["rows"]   = {(y, t): h for y, t, h in state["rows"]}
+    state["awards"] = {(y, t): h for y, t, h in state["awards"]}
+    state["awards_years"] = {int(y): h for y, h in state["awards_years"].items()}
+    return state
+
+
+def _save_state(state: dict, data_dir: Path) -> None:
+    out = {
+        **state,
+        "rows"  : [[int(y), t, h] for (y, t), h in state["rows"].items()],
+        "awards": [[int(y), t, h] for (y, t), h in state["awards"].items()],
+    }
+    tmp = data_dir / (STATE_FILE + ".tmp")
+    tmp.write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, data_dir / STATE_FILE)
+
+
+def diff_master(old: pd.DataFrame, new: pd.DataFrame, keys: set | None = None) -> dict:
+    """
+    Keys agregadas / borradas y, por key que sigue, las columnas que cambiaron.
+    `keys` limita la comparación fila a fila (en incremental, las recalculadas).
+    """
+    old_keys = set(zip(old["ceremony_year"], old["nominated_title"]))
+    new_keys = set(zip(new["ceremony_year"], new["nominated_title"]))
+    if keys is not None:
+        old, new = old[_has_key(old, keys)], new[_has_key(new, keys)]
+    old = old.drop_duplicates(KEY, keep="last").set_index(KEY)
+    new = new.drop_duplicates(KEY, keep="last").set_index(KEY)
+    common = old.index.intersection(new.index, sort=False)
+    cols   = [c for c in new.columns if c in old.columns]
+    a, b = old.loc[common, cols], new.loc[common, cols]
+
+    changed = pd.DataFrame(False, index=common, columns=cols)
+    for col in cols:
+        x, y = a[col], b[col]
+        changed[col] = ~((x == y) | (x.isna() & y.isna())).to_numpy()
+    rows = changed[changed.any(axis=1)]
+
+    return {
+        "added"          : sorted([int(y), t] for y, t in new_keys - old_keys),
+        "removed"        : sorted([int(y), t] for y, t in old_keys - new_keys),
+        "changed"        : [
+            {"ceremony_year": int(y), "nominated_title": t, "columns": list(row.index[row.to_numpy()])}
+            for (y, t), row in rows.iterrows()
+        ],
+        "columns_added"  : [c for c in new.columns if c not in old.columns],
+        "columns_removed": [c for c in old.columns if c not in new.columns],
+    }
+
+
+def _write_diff(diff: dict, data_dir: Path, mode: str) -> None:
+    diff = {"mode": mode, "built_at": time.time(), **diff}
+    (data_dir / DIFF_FILE).write_text(json.dumps(diff, ensure_ascii=False, indent=1), encoding="utf-8")
+    cols = sorted({c for row in diff["changed"] for c in row["columns"]})
+    log.info(f"Diff ({mode}): +{len(diff['added'])} / -{len(diff['removed'])} / "
+             f"~{len(diff['changed'])} filas; columnas: {', '.join(cols) or '—'}")
+
+
+def _has_key(df: pd.DataFrame, keys: set) -> list[bool]:
+    return [k in keys for k in zip(df["ceremony_year"], df["nominated_title"])]
+
+
+def _splice(prev: pd.DataFrame, rows: pd.DataFrame, drop: set, order: pd.DataFrame) -> pd.DataFrame:
+    """prev sin las keys de `drop` + las filas recalculadas, en el orden de `order` (01_tmdb)."""
+    keep = np.logical_not(_has_key(prev, drop))
+    df   = pd.concat([prev[keep], rows[prev.columns]], ignore_index=True)
+    pos  = {k: i for i, k in enumerate(zip(order["ceremony_year"], order["nominated_title"]))}
+    rank = [pos[k] for k in zip(df["ceremony_year"], df["nominated_title"])]
+    return df.iloc[np.argsort(rank, kind="stable")].reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Main
+# ─────────────────────────────────────────────────────────────────────────────
+
+def build_master(full: bool = False) -> pd.DataFrame:
+    """
+    Con un master anterior y su data/master_state.json, re-mergea y re-calcula
+    solo las keys (ceremony_year, nominated_title) cuyas filas de TMDB/OMDB o
+    premios matcheados cambiaron, y las empalma en el master guardado.
+    full=True (o cambio de columnas / MASTER_VERSION) reconstruye todo.
+    Siempre deja en data/master_diff.json qué filas y columnas cambiaron
+    respecto del master anterior (en el primer build, todas agregadas).
+    """
+    data_dir = Path(DATA_DIR)
+
+    tmdb_df   = load_table("01_tmdb", data_dir=data_dir)
+    omdb_df   = load_table("02_omdb", data_dir=data_dir)
+    awards_df = load_table("03_awards_season", data_dir=data_dir)
+
+    log.info(f"Shapes: TMDB={tmdb_df.shape}, OMDB={omdb_df.shape}, Awards={awards_df.shape}")
+
+    state = _input_state(tmdb_df, omdb_df, awards_df)
+    prev_state = _load_state(data_dir)
+    prev = load_table("master_dataset", data_dir=data_dir) if table_exists("master_dataset", data_dir) else None
+
+    mode = "incremental"
+    if full or prev is None or prev_state is None or prev_state["signature"] != state["signature"]:
+        # ── Build completo ────────────────────────────────────────────────
+        mode = "full"
+        df = merge_sources(tmdb_df, omdb_df)
+        log.info(f"Tras merge TMDB+OMDB: {df.shape}")
+        awards = match_awards(df, awards_df)
+        df = assemble(df, awards)
+        log.info(f"Tras merge awards + features: {df.shape}")
+        state["awards"] = _awards_hashes(awards)
+    else:
+        # ── Build incremental ─────────────────────────────────────────────
+        keys    = set(state["rows"])
+        removed = set(prev_state["rows"]) - keys
+        dirty   = {k for k, h in state["rows"].items() if prev_state["rows"].get(k) != h}
+
+        # el match de premios depende de los títulos de cada año y de las filas
+        # de awards: si nada de eso cambió, los premios de cada key son los de antes
+        if (state["keys"] != prev_state["keys"]
+                or state["awards_years"] != prev_state["awards_years"]):
+            awards = match_awards(tmdb_df[KEY], awards_df)
+            state["awards"] = _awards_hashes(awards)
+            dirty |= {k for k in keys | set(prev_state["awards"])
+                      if state["awards"].get(k) != prev_state["awards"].get(k)}
+        else:
+            award_cols = [c for c in awards_df.columns if c.endswith("_won") or c.endswith("_nominated")]
+            awards = prev[KEY + award_cols]
+            state["awards"] = prev_state["awards"]
+
+        dirty &= keys
+        if not dirty and not removed:
+            log.info("Master al día: ninguna key cambió")
+            _write_diff(diff_master(prev, prev, keys=set()), data_dir, mode)
+            return prev
+
+        rows = assemble(merge_sources(tmdb_df[_has_key(tmdb_df, dirty)], omdb_df[_has_key(omdb_df, dirty)]),
+                        awards[_has_key(awards, dirty)])
+        df = _splice(prev, rows, dirty | removed, tmdb_df)
+        log.info(f"Incremental: {len(dirty)} keys recalculadas, {len(removed)} borradas "
+                 f"(de {len(keys)})")
 
     # ── Guardar ───────────────────────────────────────────────────────────
-    out_csv = data_dir / "master_dataset.csv"
-    df.to_csv(out_csv, index=False)
+    # sin altas ni bajas las demás filas no se movieron: solo cambian sus años
+    years = {y for y, _ in dirty} if mode == "incremental" and state["keys"] == prev_state["keys"] else None
+    df = save_table(df, "master_dataset", data_dir, years=years)
+    _save_state(state, data_dir)
+    # sin master anterior: diff contra uno vacío (todas las filas agregadas)
+    old = prev if prev is not None else df.iloc[:0]
+    _write_diff(diff_master(old, df, None if mode == "full" else dirty), data_dir, mode)
     log.info(f"Master dataset guardado: {df.shape[0]} filas x {df.shape[1]} cols")
-    log.info(f"  -> {out_csv}")
+    log.info(f"  -> {data_dir / 'master_dataset'}.parquet / .csv")
 
     return df
 
 
 if __name__ == "__main__":
-    df = build_master()
+    parser = argparse.ArgumentParser(description="Step 4 — master dataset")
+    parser.add_argument("--full", action="store_true", help="ignorar el estado y reconstruir todo")
+    args = parser.parse_args()
+
+    df = build_master(full=args.full)
     print("\n── Columnas ──")
     print(df.dtypes.to_string())
     print("\n── Primeras 5 filas (cols clave) ──")
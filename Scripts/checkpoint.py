@@ -0,0 +1,150 @@
+"""
+Checkpoint incremental para los steps que fetchean film por film.
+
+Cada registro nuevo se appendea a un JSONL (<out>.partial.jsonl) con
+flush + fsync cada `batch_size` registros. Un crash o Ctrl-C pierde como
+máximo un batch: el resume lee el partial y saltea esos films.
+Al terminar el step, `commit_csv` vuelca existentes + partial a la tabla
+(storage.save_table: Parquet + CSV, write atómico) y borra el partial.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from storage import save_table
+
+log = logging.getLogger(__name__)
+
+
+def partial_path(out_path: Path) -> Path:
+    return out_path.with_suffix(".partial.jsonl")
+
+
+def _json_default(obj):
+    # filas que vienen de pandas traen escalares numpy
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"No serializable: {type(obj).__name__}")
+
+
+def _drop_torn_tail(path: Path, block: int = 4096) -> None:
+    """
+    Trunca el partial hasta el último salto de línea. Tras un crash a mitad
+    de write la última línea queda sin terminar; si se reabre en modo "a" el
+    primer registro nuevo se pega a ella y load_records descarta los dos.
+    """
+    if not path.exists():
+        return
+    with open(path, "rb+") as fh:
+        end = fh.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            fh.seek(start)
+            nl = fh.read(pos - start).rfind(b"\n")
+            if nl >= 0:
+                pos = start + nl + 1
+                break
+            pos = start
+        if pos < end:
+            log.warning(f"Checkpoint: {end - pos} bytes de una línea truncada descartados en {path.name}")
+            fh.truncate(pos)
+
+
+class JsonlSink:
+    """Append-only, thread-safe. Usar como context manager."""
+
+    def __init__(self, path: Path, batch_size: int = 1):
+        self.path       = Path(path)
+        self.batch_size = max(1, batch_size)
+        self._pending   = 0
+        self._lock      = threading.Lock()
+        _drop_torn_tail(self.path)
+        self._fh        = open(self.path, "a", encoding="utf-8")
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._sync()
+
+    def _sync(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._sync()
+                self._fh.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_records(path: Path) -> list[dict]:
+    """Registros del partial; una última línea truncada (crash a mitad de write) se descarta."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    records = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                log.warning(f"Checkpoint: línea truncada descartada en {path.name}")
+    return records
+
+
+def done_keys(existing: pd.DataFrame, partial: Path) -> set:
+    keys = set()
+    if not existing.empty:
+        keys |= set(zip(existing["ceremony_year"], existing["nominated_title"]))
+    keys |= {(r["ceremony_year"], r["nominated_title"]) for r in load_records(partial)}
+    return keys
+
+
+def commit_csv(
+    existing: pd.DataFrame,
+    partial: Path,
+    out_path: Path,
+    key_order: list[tuple],
+) -> pd.DataFrame:
+    """
+    existentes + partial → tabla tipada (storage.save_table: Parquet + CSV).
+    Los nuevos se ordenan según key_order para que la salida no dependa del
+    orden en que terminaron los workers.
+    """
+    existing_keys = set()
+    if not existing.empty:
+        existing_keys = set(zip(existing["ceremony_year"], existing["nominated_title"]))
+
+    rank = {key: i for i, key in enumerate(key_order)}
+    seen, records = set(existing_keys), []
+    for r in load_records(partial):
+        key = (r["ceremony_year"], r["nominated_title"])
+        if key not in seen:   # crash entre el write del CSV y el unlink del partial
+            seen.add(key)
+            records.append(r)
+    records.sort(key=lambda r: rank.get((r["ceremony_year"], r["nominated_title"]), len(rank)))
+
+    df_new = pd.DataFrame(records)
+    df = pd.concat([existing, df_new], ignore_index=True) if not existing.empty else df_new
+
+    df = save_table(df, out_path.stem, out_path.parent)
+    partial.unlink(missing_ok=True)
+    log.info(f"Guardado {len(df)} filas -> {out_path}")
+    return df
@@ -0,0 +1,106 @@
+"""
+Features relativas a la cohorte (las nominadas del mismo ceremony_year).
+
+Capturan "¿fue la mejor de su año?" y no solo "¿fue buena en absoluto?":
+  <feat>_pct_year       percentil dentro del año (rank average, NaN al fondo)
+  <feat>_is_max         1 si es el máximo del año
+  is_precursor_leader   = total_precursor_wins_is_max
+  n_nominees_year       nominadas del año
+
+Como solo dependen de las filas del mismo año, recalcular una cohorte da
+exactamente lo mismo que recalcular todo: update_cohort_features() rehace
+solo los años cuyos inputs cambiaron (p.ej. 2026 durante la temporada) y
+scrolly las calcula sobre la partición del año que puntúa.
+
+Uso: from Scripts.cohort_features import add_cohort_features
+     df = add_cohort_features(load_table("master_dataset"))
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+COHORT = "ceremony_year"
+
+PCT_FEATURES = [
+    "imdb_rating", "rt_score", "metacritic", "tmdb_vote_avg",
+    "tmdb_popularity", "budget_m", "revenue_m",
+    "total_precursor_wins", "critic_composite",
+]
+MAX_FEATURES = [
+    "imdb_rating", "rt_score", "metacritic",
+    "total_precursor_wins", "critic_composite",
+]
+INPUT_COLUMNS = list(dict.fromkeys([*PCT_FEATURES, *MAX_FEATURES]))
+
+COHORT_COLUMNS = (
+    [f"{f}_pct_year" for f in PCT_FEATURES]
+    + [f"{f}_is_max" for f in MAX_FEATURES]
+    + ["is_precursor_leader", "n_nominees_year"]
+)
+
+
+def _features(df: pd.DataFrame) -> pd.DataFrame:
+    """Todas las columnas de cohorte en una pasada agrupada (un groupby para todo)."""
+    pct_cols = [f for f in PCT_FEATURES if f in df.columns]
+    max_cols = [f for f in MAX_FEATURES if f in df.columns]
+    groups   = df.groupby(COHORT, sort=False)
+
+    out = groups[pct_cols].rank(pct=True, method="average", na_option="bottom")
+    out.columns = [f"{f}_pct_year" for f in pct_cols]
+
+    is_max = (df[max_cols] == groups[max_cols].transform("max")).astype(int)
+    is_max.columns = [f"{f}_is_max" for f in max_cols]
+    out = pd.concat([out, is_max], axis=1)
+
+    out["is_precursor_leader"] = (out["total_precursor_wins_is_max"]
+                                  if "total_precursor_wins" in max_cols else 0)
+    out["n_nominees_year"] = groups["nominated_title"].transform("count")
+    return out
+
+
+def add_cohort_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Copia de `df` con las features de cohorte de todos los años."""
+    df = df.copy()
+    feats = _features(df)
+    df[feats.columns] = feats
+    return df
+
+
+def update_cohort_features(df: pd.DataFrame, years) -> pd.DataFrame:
+    """
+    Recalcula solo las cohortes de `years`; el resto conserva sus valores.
+    Si `df` todavía no tiene las columnas, las calcula para todos los años.
+    """
+    if any(c not in df.columns for c in _features(df.head(0)).columns):
+        return add_cohort_features(df)
+    df   = df.copy(deep=False)
+    rows = df[COHORT].isin(list(years)).to_numpy()
+    if rows.any():
+        feats = _features(df[rows])
+        for col in feats.columns:
+            values = df[col].to_numpy(copy=True)
+            values[rows] = feats[col].to_numpy()
+            df[col] = values
+    return df
+
+
+def cohort_hashes(df: pd.DataFrame) -> dict[int, str]:
+    """Hash de los inputs de cada cohorte (títulos + INPUT_COLUMNS), por año."""
+    cols  = ["nominated_title", *[c for c in INPUT_COLUMNS if c in df.columns]]
+    rows  = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    years = df[COHORT].to_numpy()
+    out = {}
+    for year in np.unique(years):
+        digest = hashlib.blake2b(rows[years == year].tobytes(), digest_size=16)
+        out[int(year)] = digest.hexdigest()
+    return out
+
+
+def changed_cohorts(df: pd.DataFrame, previous: dict[int, str] | None) -> tuple[set[int], dict[int, str]]:
+    """(años cuyos inputs cambiaron respecto de `previous`, hashes actuales)."""
+    current = cohort_hashes(df)
+    if previous is None:
+        return set(current), current
+    return {y for y, h in current.items() if previous.get(y) != h}, current
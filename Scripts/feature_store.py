@@ -0,0 +1,174 @@
+"""
+Feature store: la matriz numérica del modelo materializada una vez en disco.
+
+  data/feature_store/<key>/
+    X.npy       float32 (filas, features)  df[features].fillna(-999), columnas
+                en el orden de models/features.pkl
+    y.npy       int8    won_best_picture (-1 si no hay label, p.ej. 2026)
+    years.npy   int32   ceremony_year; las filas de cada año van juntas
+    rows.npy    int64   posición de cada fila en el DataFrame de origen
+    meta.json   features, títulos, offsets por año
+
+<key> es un hash de los inputs (año, título, label y cada feature) y de la
+lista de features: mientras los datos no cambien, notebooks y scrolly abren
+los mismos .npy con mmap en vez de repetir el fillna en cada año / trial.
+Las filas de cada año van juntas, con los años en el orden en que aparecen
+en df: la matriz de un año (o de años vecinos) es una vista sin copia. Si df
+ya viene agrupado por año (el master lo está), no se mueve ninguna fila y
+una selección de años sale en el mismo orden que df[df.ceremony_year.isin(años)].
+
+Uso: from Scripts.feature_store import feature_matrix
+     fm = feature_matrix(df, joblib.load("models/features.pkl"))
+     model.predict_proba(fm.frame(2025))
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    from config import DATA_DIR
+except ImportError:
+    try:
+        from Scripts.config import DATA_DIR
+    except ImportError:   # scrolly.py sin Scripts/config.py (no se versiona)
+        DATA_DIR = "data"
+
+STORE_DIR = Path(DATA_DIR) / "feature_store"
+FILL      = -999.0    # el fillna de siempre para LightGBM
+LABEL     = "won_best_picture"
+KEEP      = 4         # versiones que se conservan (las más nuevas)
+LAYOUT    = 2         # subir si cambia cómo se escriben los .npy (entra en la key)
+
+
+def matrix_key(df: pd.DataFrame, features: list[str]) -> str:
+    """Hash de los inputs y de la lista de features (en orden)."""
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise KeyError(f"Faltan features en el DataFrame: {missing}")
+    cols = ["ceremony_year", "nominated_title", *([LABEL] if LABEL in df.columns else []), *features]
+    rows = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    digest = hashlib.blake2b(rows.tobytes(), digest_size=12)
+    digest.update(json.dumps([LAYOUT, features]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FeatureMatrix:
+    """Una versión materializada del store, abierta con mmap (solo lectura)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.key      = self.path.name
+        self.features = meta["features"]
+        self.X     = np.load(self.path / "X.npy", mmap_mode="r")
+        self.y     = np.load(self.path / "y.npy", mmap_mode="r")
+        self.years = np.load(self.path / "years.npy", mmap_mode="r")
+        self.rows  = np.load(self.path / "rows.npy", mmap_mode="r")
+        self._titles  = np.array(meta["titles"], dtype=object)
+        self._offsets = {int(y): (lo, hi) for y, lo, hi in meta["offsets"]}
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def index(self, years: int | Iterable[int] | None = None) -> slice | np.ndarray:
+        """
+        Filas de esos años en el orden del store (el de df), sea cual sea el
+        orden de `years`: slice sin copia si son contiguas; si no, índices.
+        """
+        if years is None:
+            return slice(0, len(self))
+        years  = [years] if isinstance(years, (int, np.integer)) else list(years)
+        bounds = sorted(self._offsets[int(y)] for y in years if int(y) in self._offsets)
+        if not bounds:
+            return slice(0, 0)
+        if all(a[1] == b[0] for a, b in zip(bounds, bounds[1:])):
+            return slice(bounds[0][0], bounds[-1][1])
+        return np.concatenate([np.arange(lo, hi) for lo, hi in bounds])
+
+    def matrix(self, years=None) -> tuple[np.ndarray, np.ndarray]:
+        """(X, y) de esos años."""
+        idx = self.index(years)
+        return self.X[idx], self.y[idx]
+
+    def frame(self, years=None) -> pd.DataFrame:
+        """X con nombres de columnas (lo que espera un modelo entrenado con DataFrame)."""
+        return pd.DataFrame(self.matrix(years)[0], columns=self.features, copy=False)
+
+    def labels(self, years=None) -> np.ndarray:
+        return self.y[self.index(years)]
+
+    def titles(self, years=None) -> np.ndarray:
+        return self._titles[self.index(years)]
+
+    def year_index(self, years=None) -> np.ndarray:
+        return self.years[self.index(years)]
+
+
+def _write(df: pd.DataFrame, features: list[str], path: Path) -> None:
+    years = df["ceremony_year"].to_numpy(dtype=np.int32)
+    # cada año en un bloque, los bloques en orden de primera aparición en df
+    uniq, first, block = np.unique(years, return_index=True, return_inverse=True)
+    by_first = np.argsort(first)
+    rank     = np.empty_like(by_first)
+    rank[by_first] = np.arange(len(by_first))
+    order = np.argsort(rank[block], kind="stable")
+    X = df[features].to_numpy(dtype=np.float32, na_value=FILL)[order]
+    y = (df[LABEL].fillna(-1).to_numpy(dtype=np.int8) if LABEL in df.columns
+         else np.full(len(df), -1, dtype=np.int8))[order]
+
+    counts = np.bincount(block, minlength=len(uniq))[by_first]
+    ends   = np.cumsum(counts)
+    starts = ends - counts
+    uniq   = uniq[by_first]
+
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "X.npy", np.ascontiguousarray(X))
+    np.save(tmp / "y.npy", y)
+    np.save(tmp / "years.npy", years[order])
+    np.save(tmp / "rows.npy", order.astype(np.int64))
+    (tmp / "meta.json").write_text(json.dumps({
+        "features": features,
+        "titles"  : df["nominated_title"].to_numpy(dtype=object)[order].tolist(),
+        "offsets" : [[int(u), int(s), int(e)] for u, s, e in zip(uniq, starts, ends)],
+        "built_at": time.time(),
+    }, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _prune(store_dir: Path, keep: int) -> None:
+    versions = sorted((p for p in store_dir.iterdir() if (p / "meta.json").exists()),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in versions[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def feature_matrix(
+    df: pd.DataFrame,
+    features: list[str],
+    store_dir: str | Path = STORE_DIR,
+    keep: int = KEEP,
+) -> FeatureMatrix:
+    """
+    Abre la versión del store para (df, features); si no existe la escribe.
+    `df` ya tiene que traer las features derivadas (cohort_features incluidas).
+    """
+    features  = list(features)
+    store_dir = Path(store_dir)
+    path = store_dir / matrix_key(df, features)
+    if not (path / "meta.json").exists():
+        store_dir.mkdir(parents=True, exist_ok=True)
+        _write(df, features, path)
+        _prune(store_dir, keep)
+    else:
+        os.utime(path)   # usada recién: que _prune no la borre primero
+    return FeatureMatrix(path)
@@ -9,22 +9,55 @@ Scrapes Best Film / Best Picture equivalents from:
   - PGA (Best Theatrical Motion Picture)
   - WGA (Best Adapted Screenplay)
   - WGA (Best Original Screenplay)
+  - SAG (Outstanding Cast)
+  - DGA (Feature Film)
+
+Cada premio es una entrada en AWARD_PAGES (register_award); sumar un
+precursor nuevo es registrar su página, no tocar build_awards_season_df.
+Las páginas se bajan en paralelo (con límite de cortesía por host) y el
+parseo, que es CPU-bound, corre en un pool de procesos.
+
+Re-fetch condicional: antes de bajar nada se consulta la revisión actual
+de todas las páginas (un solo request a la API de MediaWiki). Si una
+página no cambió desde el último run se reusan sus filas ya parseadas
+(data/wiki_revisions.json) sin bajar el HTML ni parsearlo.
 
 Regla: la primera película listada por año en cada tabla es la ganadora.
 
-Output: data/03_awards_season.csv
+Output: data/03_awards_season.parquet (+ .csv)
+
+Uso: python fetch_awards_season.py [--offline]
 """
 
-import time
+import hashlib
+import json
 import logging
+import argparse
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
+from urllib.parse import unquote, urlparse
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
+try:
+    import lxml.etree
+    import lxml.html
+    _LXML_OK = True
+except ImportError:
+    _LXML_OK = False
+
 from config import DATA_DIR
+from http_cache import CACHE, set_offline
+from http_client import get_with_retry, stats_summary
+from rate_limit import TokenBucket
+from storage import save_table
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
@@ -32,24 +65,127 @@ log = logging.getLogger(__name__)
 SLEEP   = 0.5
 HEADERS = {"User-Agent": "Mozilla/5.0 (OscarDatasetResearch/1.0)"}
 
+# cortesía por host: como máximo MAX_PER_HOST requests en vuelo y 1/SLEEP req/s
+MAX_PER_HOST = 4
+_host_limits: dict[str, tuple[threading.Semaphore, TokenBucket]] = {}
+_host_lock   = threading.Lock()
+
+WIKI_API       = "https://en.wikipedia.org/w/api.php"
+PARSER_VERSION = 2   # subirlo si cambia parse_award_html → invalida las filas guardadas
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _wiki_soup_url(url: str) -> BeautifulSoup:
-    r = requests.get(url, headers=HEADERS, timeout=15)
-    r.raise_for_status()
-    time.sleep(SLEEP)
-    return BeautifulSoup(r.text, "html.parser")
+def _host_limit(url: str) -> tuple[threading.Semaphore, TokenBucket]:
+    host = urlparse(url).netloc
+    with _host_lock:
+        if host not in _host_limits:
+            _host_limits[host] = (
+                threading.Semaphore(MAX_PER_HOST),
+                TokenBucket(1 / SLEEP, burst=MAX_PER_HOST),
+            )
+        return _host_limits[host]
+
+
+def _wiki_html(url: str, refresh: bool = False) -> str:
+    """refresh=True saltea el cache (la revisión cambió: el HTML cacheado está viejo)."""
+    html = None if refresh else CACHE.lookup("wiki", url)
+    if html is None:
+        slots, bucket = _host_limit(url)
+        with slots:
+            r = get_with_retry(url, headers=HEADERS, timeout=15, limiter=bucket)
+        html = r.text
+        CACHE.store("wiki", url, None, html)
+    return html
+
+
+def _wiki_title(url: str) -> str:
+    return unquote(urlparse(url).path.rsplit("/", 1)[-1]).replace("_", " ")
+
+
+def _wiki_revisions(urls: list[str]) -> dict[str, int]:
+    """url → revid actual, para todas las páginas en un solo request a la API."""
+    titles = {_wiki_title(u): u for u in urls}
+    slots, bucket = _host_limit(WIKI_API)
+    with slots:
+        r = get_with_retry(WIKI_API, headers=HEADERS, timeout=15, limiter=bucket, params={
+            "action"       : "query",
+            "prop"         : "revisions",
+            "rvprop"       : "ids",
+            "titles"       : "|".join(titles),
+            "redirects"    : 1,
+            "format"       : "json",
+            "formatversion": 2,
+        })
+    query = r.json().get("query", {})
+
+    # la API devuelve el título normalizado / post-redirect: volver al original
+    alias = {t: t for t in titles}
+    for step in query.get("normalized", []) + query.get("redirects", []):
+        for original, current in alias.items():
+            if current == step["from"]:
+                alias[original] = step["to"]
+    by_title = {
+        p["title"]: p["revisions"][0]["revid"]
+        for p in query.get("pages", []) if p.get("revisions")
+    }
+    return {titles[t]: by_title[a] for t, a in alias.items() if a in by_title}
+
+
+def _load_wiki_state(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _save_wiki_state(path: Path, state: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _parse_key(page: "AwardPage", years: list[int]) -> str:
+    """Las filas guardadas sirven solo si se parsearon con los mismos parámetros."""
+    raw = json.dumps([PARSER_VERSION, page.award, page.year_offset, page.film_col, sorted(years)])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+_REF_RE   = re.compile(r"\[.*?\]")
+_MARKS_RE = re.compile(r"[†‡§*]")
+_YEAR_RE  = re.compile(r"(19|20)\d{2}")
+
+# mismo selector que soup.select("table.wikitable tr") + row.find_all(["td", "th"])
+_WIKITABLE_ROWS = "//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]//tr"
 
 
 def _clean(text: str) -> str:
-    text = re.sub(r"\[.*?\]", "", text)
-    text = re.sub(r"[†‡§*]", "", text)
+    text = _REF_RE.sub("", text)
+    text = _MARKS_RE.sub("", text)
     return text.strip().rstrip(".")
 
 
+def _iter_rows_lxml(html: str) -> Iterator[list[str]]:
+    """Texto de las celdas de cada fila de las wikitables; lxml no arma el resto de la página."""
+    tree = lxml.html.fromstring(html)
+    # get_text() de bs4 no incluye <style>/<script> (TemplateStyles dentro de las celdas);
+    # text_content() sí: se sacan antes, conservando el texto que sigue a cada tag
+    lxml.etree.strip_elements(tree, "style", "script", with_tail=False)
+    for row in tree.xpath(_WIKITABLE_ROWS):
+        yield [cell.text_content() for cell in row.xpath(".//td|.//th")]
+
+
+def _iter_rows_bs4(html: str) -> Iterator[list[str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    for row in soup.select("table.wikitable tr"):
+        yield [cell.get_text() for cell in row.find_all(["td", "th"])]
+
+
+def _iter_rows(html: str, fast: bool = True) -> Iterator[list[str]]:
+    if fast and _LXML_OK:
+        return _iter_rows_lxml(html)
+    return _iter_rows_bs4(html)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Scraper genérico
 # ─────────────────────────────────────────────────────────────────────────────
@@ -62,9 +198,23 @@ def scrape_award_from_url(
     award_name: str,
     years: list[int],
     year_offset: int = 0,
+    film_col: int = 1,
+) -> list[dict]:
+    """Baja la página y la parsea con parse_award_html."""
+    return parse_award_html(_wiki_html(url), award_name, years, year_offset, film_col)
+
+
+def parse_award_html(
+    html: str,
+    award_name: str,
+    years: list[int],
+    year_offset: int = 0,
+    film_col: int = 1,
+    fast: bool = True,
 ) -> list[dict]:
     """
-    Parsea la primera wikitable de la URL dada.
+    Parsea las wikitables del HTML dado. Función top-level (picklable)
+    para poder correrla en el pool de procesos.
 
     Dos variantes de tabla Wikipedia:
       1) Año + ganadora en la misma fila (año con rowspan):
@@ -75,26 +225,30 @@ def scrape_award_from_url(
          | 2021 (colspan) |
          | Nomadland      |  ← primera fila = ganadora
          | Promising..    |  ← nominada
+
+    film_col = columna del film en las filas con año (DGA: Año | Director | Film → 2);
+    en las filas sin año la celda del año no está (rowspan) → film_col - 1.
+
+    fast=True usa lxml (si está instalado) solo sobre las filas de wikitables;
+    fast=False es el parser original con BeautifulSoup. Mismo output fila por fila.
     """
-    soup = _wiki_soup_url(url)
     records = []
     current_year = None
     first_in_year = False
 
-    for row in soup.select("table.wikitable tr"):
-        cells = row.find_all(["td", "th"])
+    for cells in _iter_rows(html, fast):
         if not cells:
             continue
 
-        first_text = _clean(cells[0].get_text())
-        m = re.search(r"(19|20)\d{2}", first_text)
+        first_text = _clean(cells[0])
+        m = _YEAR_RE.search(first_text)
 
         if m:
             year = int(m.group()) + year_offset
 
             # ¿Hay film válido en esta misma fila?
-            if len(cells) >= 2:
-                film = _clean(cells[1].get_text())
+            if len(cells) > film_col:
+                film = _clean(cells[film_col])
                 if film.lower() not in SKIP_TEXTS:
                     # Variante 1: año + ganadora en misma fila
                     current_year = year
@@ -116,7 +270,9 @@ def scrape_award_from_url(
             # Fila sin año → nominada (o primera=ganadora si first_in_year)
             if current_year is None or current_year not in years:
                 continue
-            film = _clean(cells[0].get_text())
+            if len(cells) < film_col:
+                continue
+            film = _clean(cells[film_col - 1])
             if film.lower() in SKIP_TEXTS:
                 continue
             won = 1 if first_in_year else 0
@@ -132,63 +288,54 @@ def scrape_award_from_url(
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  Award wrappers
+#  Registro de premios
 # ─────────────────────────────────────────────────────────────────────────────
 
-def scrape_bafta_best_film(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/BAFTA_Award_for_Best_Film",
-        "BAFTA_best_film", years,
-    )
-
-
-def scrape_gg_drama(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Golden_Globe_Award_for_Best_Motion_Picture_%E2%80%93_Drama",
-        "GG_drama", years,
-    )
-
-
-def scrape_gg_comedy(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Golden_Globe_Award_for_Best_Motion_Picture_%E2%80%93_Musical_or_Comedy",
-        "GG_comedy", years,
-    )
-
-
-def scrape_gg_animation(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Golden_Globe_Award_for_Best_Animated_Feature_Film",
-        "GG_animation", years,
-    )
-
+@dataclass(frozen=True)
+class AwardPage:
+    label      : str     # para logs
+    award      : str     # prefijo de columnas: <award>_won / <award>_nominated
+    url        : str
+    year_offset: int = 0
+    film_col   : int = 1
 
-def scrape_critics_choice(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Critics%27_Choice_Movie_Award_for_Best_Picture",
-        "CCA_best_picture", years,
-    )
 
+AWARD_PAGES: list[AwardPage] = []
 
-def scrape_pga(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Producers_Guild_of_America_Award_for_Best_Theatrical_Motion_Picture",
-        "PGA_best_picture", years,
-    )
 
-
-def scrape_wga_adapted(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Writers_Guild_of_America_Award_for_Best_Adapted_Screenplay",
-        "WGA_adapted", years,
-    )
-
-
-def scrape_wga_original(years: list[int]) -> list[dict]:
-    return scrape_award_from_url(
-        "https://en.wikipedia.org/wiki/Writers_Guild_of_America_Award_for_Best_Original_Screenplay",
-        "WGA_original", years,
-    )
+def register_award(
+    label: str,
+    award: str,
+    url: str,
+    year_offset: int = 0,
+    film_col: int = 1,
+) -> None:
+    AWARD_PAGES.append(AwardPage(label, award, url, year_offset, film_col))
+
+
+WIKI = "https://en.wikipedia.org/wiki/"
+
+register_award("BAFTA",          "BAFTA_best_film",
+               WIKI + "BAFTA_Award_for_Best_Film")
+register_award("GG Drama",       "GG_drama",
+               WIKI + "Golden_Globe_Award_for_Best_Motion_Picture_%E2%80%93_Drama")
+register_award("GG Comedy",      "GG_comedy",
+               WIKI + "Golden_Globe_Award_for_Best_Motion_Picture_%E2%80%93_Musical_or_Comedy")
+register_award("GG Animation",   "GG_animation",
+               WIKI + "Golden_Globe_Award_for_Best_Animated_Feature_Film")
+register_award("Critics Choice", "CCA_best_picture",
+               WIKI + "Critics%27_Choice_Movie_Award_for_Best_Picture")
+register_award("PGA",            "PGA_best_picture",
+               WIKI + "Producers_Guild_of_America_Award_for_Best_Theatrical_Motion_Picture")
+register_award("WGA Adapted",    "WGA_adapted",
+               WIKI + "Writers_Guild_of_America_Award_for_Best_Adapted_Screenplay")
+register_award("WGA Original",   "WGA_original",
+               WIKI + "Writers_Guild_of_America_Award_for_Best_Original_Screenplay")
+register_award("SAG Ensemble",   "SAG_ensemble",
+               WIKI + "Screen_Actors_Guild_Award_for_Outstanding_Performance_by_a_Cast_in_a_Motion_Picture")
+register_award("DGA",            "DGA_feature",
+               WIKI + "Directors_Guild_of_America_Award_for_Outstanding_Directing_%E2%80%93_Feature_Film",
+               film_col=2)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -224,36 +371,73 @@ def pivot_awards(records: list[dict]) -> pd.DataFrame:
 #  Main
 # ─────────────────────────────────────────────────────────────────────────────
 
-def build_awards_season_df(years: list[int]) -> pd.DataFrame:
+def build_awards_season_df(years: list[int], processes: int | None = None) -> pd.DataFrame:
     Path(DATA_DIR).mkdir(exist_ok=True)
-    out_path = Path(DATA_DIR) / "03_awards_season.csv"
-
-    scrapers = [
-        ("BAFTA",          scrape_bafta_best_film),
-        ("GG Drama",       scrape_gg_drama),
-        ("GG Comedy",      scrape_gg_comedy),
-        ("GG Animation",   scrape_gg_animation),
-        ("Critics Choice", scrape_critics_choice),
-        ("PGA",            scrape_pga),
-        ("WGA Adapted",    scrape_wga_adapted),
-        ("WGA Original",   scrape_wga_original),
-    ]
-
-    records = []
-    for name, fn in scrapers:
-        log.info(f"Scraping {name}...")
-        records += fn(years)
-
+    out_path   = Path(DATA_DIR) / "03_awards_season.csv"
+    state_path = Path(DATA_DIR) / "wiki_revisions.json"
+
+    # revisión actual de cada página; offline o si la API falla → sin re-fetch condicional
+    revisions: dict[str, int] = {}
+    if not CACHE.offline:
+        try:
+            revisions = _wiki_revisions([page.url for page in AWARD_PAGES])
+        except Exception as e:
+            log.warning(f"Lookup de revisiones falló ({e}) — se bajan todas las páginas")
+    state = _load_wiki_state(state_path)
+
+    parsed: dict[AwardPage, list[dict]] = {}
+    stale = []
+    for page in AWARD_PAGES:
+        prev = state.get(page.url)
+        rev  = revisions.get(page.url)
+        if rev and prev and prev["revid"] == rev and prev["parse_key"] == _parse_key(page, years):
+            log.info(f"{page.label}: sin cambios (rev {rev}) — reuso filas parseadas")
+            parsed[page] = prev["records"]
+        else:
+            stale.append(page)
+
+    if stale:
+        # spawn: el pipeline llama a esto desde un thread, y fork + threads no se lleva bien
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as parse_pool, \
+             ThreadPoolExecutor(max_workers=len(stale)) as fetch_pool:
+
+            def scrape(page: AwardPage) -> list[dict]:
+                log.info(f"Scraping {page.label}...")
+                rev  = revisions.get(page.url)
+                html = _wiki_html(page.url, refresh=rev is not None)
+                records = parse_pool.submit(
+                    parse_award_html, html, page.award, years, page.year_offset, page.film_col,
+                ).result()
+                if rev:
+                    state[page.url] = {
+                        "revid"    : rev,
+                        "parse_key": _parse_key(page, years),
+                        "records"  : records,
+                    }
+                return records
+
+            for page, records in zip(stale, fetch_pool.map(scrape, stale)):
+                parsed[page] = records
+        _save_wiki_state(state_path, state)
+
+    # orden de AWARD_PAGES → mismo CSV que el loop serial
+    records = [r for page in AWARD_PAGES for r in parsed[page]]
     log.info(f"Total raw award rows: {len(records)}")
 
-    wide = pivot_awards(records)
-    wide.to_csv(out_path, index=False)
+    wide = save_table(pivot_awards(records), "03_awards_season", out_path.parent)
     log.info(f"Saved {len(wide)} rows → {out_path}")
     return wide
 
 
 if __name__ == "__main__":
     from config import YEARS
+    parser = argparse.ArgumentParser(description="Step 3 — Awards Season scraper")
+    parser.add_argument("--offline", action="store_true",
+                        help="solo cache local, sin red (falla si falta algo)")
+    set_offline(parser.parse_args().offline)
+
     df = build_awards_season_df(YEARS)
+    log.info(f"HTTP: {stats_summary()}")
     print(df.head(10))
     print(df.columns.tolist())
@@ -3,19 +3,28 @@ Step 2 — OMDB enrichment
 Fetches: imdb_id, imdb_rating, imdb_votes, rt_score, metacritic_score,
          box_office_usd, rated (PG/R/etc), awards_text
 
-Requires: data/01_tmdb.csv
-Output:   data/02_omdb.csv
+Requires: data/01_tmdb.csv (usa su imdb_id para buscar por i=, no por título)
+Output:   data/02_omdb.parquet (+ .csv)
+
+Uso: python fetch_omdb.py [--offline]
 """
 
-import time
-import re
+import json
 import logging
+import argparse
 from pathlib import Path
 
-import requests
 import pandas as pd
 
 from config import OMDB_API_KEY, DATA_DIR
+from http_cache import CACHE, set_offline
+from http_client import get_with_retry, stats_summary
+from rate_limit import TokenBucket
+from resolve_cache import NEGATIVE, SingleFlight
+from nominees_ground_truth import ID_OVERRIDES
+from raw_lake import OMDB_LAKE
+from checkpoint import JsonlSink, commit_csv, done_keys, partial_path
+from storage import load_table, table_exists
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
@@ -23,115 +32,172 @@ log = logging.getLogger(__name__)
 BASE_URL = "http://www.omdbapi.com/"
 SLEEP    = 0.15
 
+# 1/SLEEP req/s, compartido entre el loop serial y los workers del pipeline
+RATE_PER_SEC = 1 / SLEEP
+_LIMITER     = TokenBucket(RATE_PER_SEC, burst=2)
+_LOOKUPS     = SingleFlight()
+
 
 # ── helpers ───────────────────────────────────────────────────────────────────
 
-def _parse_int(val: str | None) -> int | None:
-    if not val or val == "N/A":
-        return None
-    return int(re.sub(r"[^0-9]", "", val)) or None
+def _parse_int(vals: pd.Series) -> pd.Series:
+    """'1,234' / '$12,345' → 1234 / 12345; 'N/A', sin dígitos o 0 → NA."""
+    digits = vals.where(vals != "N/A").astype("string").str.replace(r"[^0-9]", "", regex=True)
+    nums   = pd.to_numeric(digits.replace("", pd.NA), errors="coerce").astype("Int64")
+    return nums.where(nums != 0)
 
 
-def _parse_float(val: str | None) -> float | None:
-    if not val or val == "N/A":
-        return None
-    try:
-        return float(val)
-    except ValueError:
-        return None
+def _parse_float(vals: pd.Series) -> pd.Series:
+    return pd.to_numeric(vals.where(vals != "N/A"), errors="coerce")
 
 
-def fetch_omdb(title: str, year: int) -> dict:
+def _omdb_get(params: dict) -> dict:
+    """GET con cache; los hits de la red (no los del cache) van al raw lake."""
+    cached = CACHE.lookup("omdb", BASE_URL, params)
+    if cached is not None:
+        return json.loads(cached)
+    resp = get_with_retry(BASE_URL, params=params, timeout=10, limiter=_LIMITER)
+    CACHE.store("omdb", BASE_URL, params, resp.text)
+    data = resp.json()
+    if data.get("Response") == "True":
+        OMDB_LAKE.append(data.get("imdbID"), data)
+    return data
+
+
+def fetch_omdb(title: str, year: int, imdb_id: str | None = None) -> dict:
     """
     year = release year of the film (ceremony_year - 1).
-    OMDB returns Ratings list: [{Source, Value}, ...] which includes RT.
+    Con imdb_id (viene de TMDB) se resuelve en un solo request y sin
+    ambigüedad; la búsqueda por título queda como último recurso.
     """
+    if imdb_id:
+        data = _omdb_get({"i": imdb_id, "apikey": OMDB_API_KEY, "type": "movie"})
+        if data.get("Response") == "True":
+            return _parse_omdb(data)
+        log.warning(f"OMDB miss por imdb_id {imdb_id} — fallback a título")
+
     params = {
         "t"      : title,
         "y"      : year,
         "apikey" : OMDB_API_KEY,
         "type"   : "movie",
     }
-    resp = requests.get(BASE_URL, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _omdb_get(params)
 
     if data.get("Response") == "False":
         # retry without year constraint
         params.pop("y")
-        resp = requests.get(BASE_URL, params=params, timeout=10)
-        data = resp.json()
+        data = _omdb_get(params)
         if data.get("Response") == "False":
             log.warning(f"OMDB miss: {title!r} ({year})")
             return {}
 
+    return _parse_omdb(data)
+
+
+def _parse_omdb(data: dict) -> dict:
+    row = extract_omdb([data])
+    return row.astype(object).where(row.notna(), None).to_dict("records")[0]
+
+
+def extract_omdb(payloads: list[dict]) -> pd.DataFrame:
+    """
+    Payloads crudos de OMDB → columnas de 02_omdb.csv, en una pasada.
+    La usa _parse_omdb para un film y rebuild_from_lake.py para el lake entero.
+    OMDB returns Ratings list: [{Source, Value}, ...] which includes RT.
+    """
+    raw = pd.DataFrame(payloads)
+    for col in ["imdbID", "imdbRating", "imdbVotes", "Metascore", "BoxOffice",
+                "Rated", "Awards", "Country", "Language", "Ratings"]:
+        if col not in raw.columns:
+            raw[col] = None
+
     # ── parse ratings list ────────────────────────────────────────────────
-    ratings: dict[str, str] = {
-        r["Source"]: r["Value"]
-        for r in data.get("Ratings", [])
-    }
-    rt_raw   = ratings.get("Rotten Tomatoes", None)
-    rt_score = _parse_int(rt_raw.replace("%", "") if rt_raw else None)
-
-    return {
-        "imdb_id"        : data.get("imdbID"),
-        "imdb_rating"    : _parse_float(data.get("imdbRating")),
-        "imdb_votes"     : _parse_int(data.get("imdbVotes")),
-        "metacritic"     : _parse_int(data.get("Metascore")),
-        "rt_score"       : rt_score,
-        "box_office_usd" : _parse_int(data.get("BoxOffice")),
-        "rated"          : data.get("Rated"),
-        "omdb_awards"    : data.get("Awards"),
-        "country"        : data.get("Country"),
-        "language"       : data.get("Language"),
-    }
+    ratings = raw["Ratings"].explode().dropna()
+    source  = ratings.map(lambda r: r.get("Source"))
+    rt_raw  = ratings[source == "Rotten Tomatoes"].map(lambda r: r.get("Value"))
+    rt_raw  = rt_raw.groupby(level=0).first().reindex(raw.index)
+
+    return pd.DataFrame({
+        "imdb_id"        : raw["imdbID"],
+        "imdb_rating"    : _parse_float(raw["imdbRating"]),
+        "imdb_votes"     : _parse_int(raw["imdbVotes"]),
+        "metacritic"     : _parse_int(raw["Metascore"]),
+        "rt_score"       : _parse_int(rt_raw),
+        "box_office_usd" : _parse_int(raw["BoxOffice"]),
+        "rated"          : raw["Rated"],
+        "omdb_awards"    : raw["Awards"],
+        "country"        : raw["Country"],
+        "language"       : raw["Language"],
+    })
+
+
+def fetch_omdb_row(row: dict) -> dict:
+    """
+    Fila de 01_tmdb (dict) → fila de 02_omdb.csv.
+    imdb_id: ID_OVERRIDES > el que trajo TMDB. Con imdb_id se va directo al
+    lookup por `i=` sin mirar el negative cache (un override nuevo o un
+    imdb_id que TMDB no tenía antes tiene que poder levantar un miss viejo);
+    solo los misses por título van al negative cache.
+    """
+    ceremony_year = int(row["ceremony_year"])
+    title         = row["nominated_title"]
+    key           = {"ceremony_year": row["ceremony_year"], "nominated_title": title}
+
+    # prefer TMDB title for OMDB search (handles accented chars etc.)
+    tmdb_title   = row.get("tmdb_title")
+    search_title = tmdb_title if isinstance(tmdb_title, str) and tmdb_title else title
+
+    imdb_id = ID_OVERRIDES.get((ceremony_year, title), {}).get("imdb_id") or row.get("imdb_id")
+    if not (isinstance(imdb_id, str) and imdb_id.startswith("tt")):
+        imdb_id = None
+
+    if imdb_id is None and NEGATIVE.is_miss("omdb", ceremony_year, title):
+        log.info(f"Negative cache: OMDB {title!r} ({ceremony_year}) — salteado")
+        return key
+
+    log.info(f"OMDB [{ceremony_year}] {search_title!r}")
+    omdb_data = _LOOKUPS.do(
+        (search_title, ceremony_year, imdb_id),
+        lambda: fetch_omdb(search_title, ceremony_year - 1, imdb_id=imdb_id),
+    )
+    if not omdb_data and imdb_id is None:
+        NEGATIVE.add("omdb", ceremony_year, title)
+    return {**key, **omdb_data}
 
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
-def build_omdb_df() -> pd.DataFrame:
-    tmdb_path = Path(DATA_DIR) / "01_tmdb.csv"
-    assert tmdb_path.exists(), "Correr fetch_tmdb.py primero"
-    base_df = pd.read_csv(tmdb_path)
+def build_omdb_df(checkpoint_every: int = 1) -> pd.DataFrame:
+    assert table_exists("01_tmdb"), "Correr fetch_tmdb.py primero"
+    base_df = load_table("01_tmdb")
 
     out_path = Path(DATA_DIR) / "02_omdb.csv"
-    done_titles: set = set()
-    if out_path.exists():
-        existing    = pd.read_csv(out_path)
-        done_titles = set(zip(existing["ceremony_year"], existing["nominated_title"]))
+    partial  = partial_path(out_path)
+
+    existing    = load_table("02_omdb") if table_exists("02_omdb") else pd.DataFrame()
+    done_titles = done_keys(existing, partial)
+    if done_titles:
         log.info(f"Resumiendo — {len(done_titles)} registros ya fetcheados")
-    else:
-        existing = pd.DataFrame()
-
-    records = []
-    for _, row in base_df.iterrows():
-        key = (row["ceremony_year"], row["nominated_title"])
-        if key in done_titles:
-            continue
-
-        release_year = int(row["ceremony_year"]) - 1
-        title        = row["nominated_title"]
-
-        # prefer TMDB title for OMDB search (handles accented chars etc.)
-        search_title = row.get("tmdb_title") or title
-        log.info(f"OMDB [{row['ceremony_year']}] {search_title!r}")
-
-        omdb_data = fetch_omdb(search_title, release_year)
-        rec = {
-            "ceremony_year"  : row["ceremony_year"],
-            "nominated_title": title,
-            **omdb_data,
-        }
-        records.append(rec)
-        time.sleep(SLEEP)
-
-    df_new = pd.DataFrame(records)
-    df = pd.concat([existing, df_new], ignore_index=True) if not existing.empty else df_new
-    df.to_csv(out_path, index=False)
-    log.info(f"Guardado {len(df)} filas -> {out_path}")
-    return df
+
+    base_rows = base_df.to_dict("records")
+    with JsonlSink(partial, batch_size=checkpoint_every) as sink:
+        for row in base_rows:
+            if (row["ceremony_year"], row["nominated_title"]) in done_titles:
+                continue
+            # sin sleep fijo: _LIMITER pausa solo los requests que van a la red
+            sink.append(fetch_omdb_row(row))
+
+    key_order = [(r["ceremony_year"], r["nominated_title"]) for r in base_rows]
+    return commit_csv(existing, partial, out_path, key_order)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Step 2 — OMDB enrichment")
+    parser.add_argument("--offline", action="store_true",
+                        help="solo cache local, sin red (falla si falta algo)")
+    set_offline(parser.parse_args().offline)
+
     df = build_omdb_df()
+    log.info(f"HTTP: {stats_summary()}")
     print(df[["ceremony_year", "nominated_title", "imdb_rating", "rt_score", "box_office_usd"]].head(10))
\ No newline at end of file
@@ -1,150 +1,366 @@
 """
 Step 1 — TMDB enrichment
-Fetches: tmdb_id, synopsis, budget, revenue, runtime, genres,
+Fetches: tmdb_id, imdb_id, synopsis, budget, revenue, runtime, genres,
          release_date, original_language, popularity, vote_average, vote_count
-         + cast top-5, director
+         + cast top-5, director, keywords, fechas de estreno US (limitado / wide),
+           cantidad de reviews — todo en un solo request por film
 
-Output: data/01_tmdb.csv
+Output: data/01_tmdb.parquet (+ .csv)
+
+Uso: python fetch_tmdb.py [--workers N] [--offline]
+  --workers > 1 activa el modo concurrente (N films en vuelo, un solo
+  token bucket global). El CSV resultante es idéntico al del modo serial.
+  --offline sirve todo desde data/http_cache.sqlite; un miss es error.
+
+Si existe data/title_index/ (python title_index.py --download) los títulos
+no ambiguos se resuelven localmente y solo el resto va a search/movie.
 """
 
-import time
 import json
 import logging
+import argparse
 from pathlib import Path
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
 import pandas as pd
 
 # ── local imports ─────────────────────────────────────────────────────────────
-from nominees_ground_truth import OSCAR_BEST_PICTURE
+from nominees_ground_truth import OSCAR_BEST_PICTURE, ID_OVERRIDES
 from config import TMDB_API_KEY, DATA_DIR
+from rate_limit import TokenBucket
+from http_cache import CACHE, CacheMiss, set_offline
+from http_client import REQUEST_ERRORS, get_with_retry, stats_summary
+from resolve_cache import NEGATIVE, SingleFlight
+from title_index import TITLE_INDEX
+from title_match import normalize_title
+from raw_lake import TMDB_LAKE
+from checkpoint import JsonlSink, commit_csv, done_keys, partial_path
+from storage import load_table, table_exists
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
 
 BASE_URL = "https://api.themoviedb.org/3"
-SLEEP    = 0.25
+
+# TMDB tolera ~40 req/s; nos quedamos bastante por debajo
+RATE_PER_SEC = 20
+RATE_BURST   = 10
+_LIMITER     = TokenBucket(RATE_PER_SEC, RATE_BURST)
+_SEARCHES    = SingleFlight()
 
 
 # ── helpers ───────────────────────────────────────────────────────────────────
 
-def _get(endpoint: str, params: dict = {}) -> dict:
-    """Thin wrapper with retry on 429. Usa api_key como query param."""
+def _get(endpoint: str, params: dict = {}, lake_key: int | None = None) -> dict:
+    """
+    Thin wrapper con retry/backoff (get_with_retry). Usa api_key como query param.
+    Con lake_key el payload va al raw lake, solo si vino de la red: un hit del
+    cache HTTP ya se guardó la primera vez y re-appendearlo duplica el lake.
+    """
     url = f"{BASE_URL}/{endpoint}"
-    all_params = {"api_key": TMDB_API_KEY, **params}
-    for attempt in range(4):
-        resp = requests.get(url, params=all_params, timeout=10)
-        if resp.status_code == 429:
-            wait = int(resp.headers.get("Retry-After", 5))
-            log.warning(f"Rate limited, sleeping {wait}s")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-        return resp.json()
-    raise RuntimeError(f"Failed after retries: {url}")
+    cached = CACHE.lookup("tmdb", url, params)
+    if cached is not None:
+        return json.loads(cached)
+
+    resp = get_with_retry(url, params={"api_key": TMDB_API_KEY, **params},
+                          timeout=10, limiter=_LIMITER)
+    CACHE.store("tmdb", url, params, resp.text)
+    data = resp.json()
+    if lake_key is not None:
+        TMDB_LAKE.append(lake_key, data)
+    return data
+
+
+def _score_candidate(r: dict, title: str, release_year: int, max_pop: float) -> float:
+    """
+    Confianza 0-1 de que el resultado `r` sea el film nominado:
+      60% título (exacto tras normalize_title = 1, si no similitud difflib x 0.8)
+      30% distancia de año (0 → 1, ±1 → 0.6, más → 0)
+      10% popularidad relativa entre los candidatos
+    """
+    t = normalize_title(title)
+    names = {normalize_title(r.get("title", "")), normalize_title(r.get("original_title", ""))}
+    if t in names:
+        title_score = 1.0
+    else:
+        title_score = 0.8 * max(SequenceMatcher(None, t, n).ratio() for n in names)
+
+    year = int(r["release_date"][:4]) if r.get("release_date") else r["_probe_year"]
+    year_score = {0: 1.0, 1: 0.6}.get(abs(year - release_year), 0.0)
+
+    pop_score = (r.get("popularity") or 0) / max_pop if max_pop else 0.0
+    return 0.6 * title_score + 0.3 * year_score + 0.1 * pop_score
 
 
 def search_movie(title: str, ceremony_year: int) -> int | None:
     """
     Return TMDB movie_id para un titulo dado.
+    Orden: ID fijado en ID_OVERRIDES → negative cache → índice local de
+    títulos (title_index.py) → búsqueda en la API (single-flight).
+    """
+    pinned = ID_OVERRIDES.get((ceremony_year, title), {}).get("tmdb_id")
+    if pinned:
+        log.info(f"Override: {title!r} ({ceremony_year}) -> tmdb_id={pinned}")
+        return pinned
+
+    if NEGATIVE.is_miss("tmdb", ceremony_year, title):
+        log.info(f"Negative cache: {title!r} ({ceremony_year}) — salteado")
+        return None
+
+    tmdb_id = _from_index(title, ceremony_year)
+    if tmdb_id:
+        return tmdb_id
+
+    tmdb_id = _SEARCHES.do(
+        (ceremony_year, title), lambda: _search_movie(title, ceremony_year)
+    )
+    if tmdb_id is None:
+        NEGATIVE.add("tmdb", ceremony_year, title)
+    return tmdb_id
+
+
+def _from_index(title: str, ceremony_year: int) -> int | None:
+    """
+    Candidato no ambiguo del índice local, confirmado por año de estreno
+    (±1). El export no trae años: se chequean con el request de details,
+    que queda en el cache y es el mismo que hace fetch_movie_details.
+    Si ese request falla (ID borrado → 404, reintentos agotados) se cae a
+    search/movie; un CacheMiss de --offline sí se propaga.
+    """
+    tmdb_id = TITLE_INDEX.resolve(title)
+    if tmdb_id is None:
+        return None
+
+    try:
+        details = _get(f"movie/{tmdb_id}", DETAILS_PARAMS, lake_key=tmdb_id)
+    except REQUEST_ERRORS as e:
+        log.warning(f"Índice: {title!r} -> tmdb_id={tmdb_id} sin details ({e}) — uso search/movie")
+        return None
+    release = details.get("release_date") or ""
+    if not release[:4].isdigit() or abs(int(release[:4]) - (ceremony_year - 1)) > 1:
+        log.info(f"Índice: {title!r} -> tmdb_id={tmdb_id} descartado (estreno {release or '?'})")
+        return None
+    log.info(f"Índice: {title!r} ({ceremony_year}) -> tmdb_id={tmdb_id}")
+    return tmdb_id
+
+
+def _search_movie(title: str, ceremony_year: int) -> int | None:
+    """
     Release year = ceremony_year - 1.
-    Prueba año exacto primero, luego +/-1.
+    Los tres probes (año exacto, -1, +1) salen en paralelo → una sola
+    latencia de red; los candidatos se puntúan localmente.
     """
     release_year = ceremony_year - 1
-    for year in [release_year, release_year - 1, release_year + 1]:
+    years = [release_year, release_year - 1, release_year + 1]
+
+    def probe(year: int) -> list[dict]:
         data = _get("search/movie", {"query": title, "year": year, "language": "en-US"})
-        results = data.get("results", [])
-        if results:
-            for r in results:
-                if r["title"].lower() == title.lower():
-                    return r["id"]
-            return results[0]["id"]
-    log.warning(f"Not found: {title!r} ({ceremony_year})")
-    return None
+        return [{**r, "_probe_year": year} for r in data.get("results", [])]
 
+    with ThreadPoolExecutor(max_workers=len(years)) as pool:
+        probes = list(pool.map(probe, years))
 
-def fetch_movie_details(tmdb_id: int) -> dict:
-    """Trae detalles completos + credits en una sola request."""
-    details = _get(f"movie/{tmdb_id}", {"language": "en-US", "append_to_response": "credits"})
-
-    credits   = details.get("credits", {})
-    cast_top5 = [c["name"] for c in credits.get("cast", [])[:5]]
-    director  = next(
-        (c["name"] for c in credits.get("crew", []) if c["job"] == "Director"),
-        None
+    candidates = {}
+    for results in probes:
+        for r in results:
+            candidates.setdefault(r["id"], r)
+    if not candidates:
+        log.warning(f"Not found: {title!r} ({ceremony_year})")
+        return None
+
+    max_pop = max((r.get("popularity") or 0) for r in candidates.values())
+    conf, best = max(
+        ((_score_candidate(r, title, release_year, max_pop), r) for r in candidates.values()),
+        key=lambda x: x[0],
     )
-    genres = [g["name"] for g in details.get("genres", [])]
-
-    return {
-        "tmdb_id"             : tmdb_id,
-        "tmdb_title"          : details.get("title"),
-        "synopsis"            : details.get("overview"),
-        "tagline"             : details.get("tagline"),
-        "budget"              : details.get("budget"),
-        "revenue"             : details.get("revenue"),
-        "runtime_min"         : details.get("runtime"),
-        "release_date"        : details.get("release_date"),
-        "original_language"   : details.get("original_language"),
-        "genres"              : json.dumps(genres),
-        "tmdb_popularity"     : details.get("popularity"),
-        "tmdb_vote_avg"       : details.get("vote_average"),
-        "tmdb_vote_count"     : details.get("vote_count"),
-        "director"            : director,
-        "cast_top5"           : json.dumps(cast_top5),
-        "production_companies": json.dumps(
-            [c["name"] for c in details.get("production_companies", [])[:3]]
-        ),
+    log.info(f"Resolved {title!r} ({ceremony_year}) -> tmdb_id={best['id']} "
+             f"{best.get('title')!r} conf={conf:.2f}")
+    return best["id"]
+
+
+# sub-recursos que viajan en el mismo request de details (append_to_response)
+DETAILS_APPEND = ["credits", "external_ids", "keywords", "release_dates", "reviews"]
+DETAILS_PARAMS = {"language": "en-US", "append_to_response": ",".join(DETAILS_APPEND)}
+
+
+def fetch_movie_details(tmdb_id: int) -> dict:
+    """Trae detalles completos + todos los sub-recursos de DETAILS_APPEND en una sola request."""
+    details = _get(f"movie/{tmdb_id}", DETAILS_PARAMS, lake_key=tmdb_id)
+    return extract_tmdb_details([details]).to_dict("records")[0]
+
+
+# ── extracción (vectorizada): payloads crudos → columnas de 01_tmdb.csv ──────
+
+TMDB_SCALARS = {
+    "id"               : "tmdb_id",
+    "title"            : "tmdb_title",
+    "overview"         : "synopsis",
+    "tagline"          : "tagline",
+    "budget"           : "budget",
+    "revenue"          : "revenue",
+    "runtime"          : "runtime_min",
+    "release_date"     : "release_date",
+    "original_language": "original_language",
+    "popularity"       : "tmdb_popularity",
+    "vote_average"     : "tmdb_vote_avg",
+    "vote_count"       : "tmdb_vote_count",
+}
+
+
+def _field(dicts: pd.Series, key: str) -> pd.Series:
+    """dicts.str.get(key) sin depender del dtype inferido (columna toda NaN, etc.)."""
+    return dicts.map(lambda d: d.get(key) if isinstance(d, dict) else None)
+
+
+def _names(lists: pd.Series, limit: int | None = None, job: str | None = None) -> pd.Series:
+    """Serie de listas de dicts → Serie de listas de `name` (filtrando por job, top-N)."""
+    items = lists.explode()
+    if job is not None:
+        items = items[_field(items, "job") == job]
+    names = _field(items, "name").dropna()
+    if limit is not None:
+        names = names[names.groupby(level=0).cumcount() < limit]
+    grouped = names.groupby(level=0).agg(list)
+    return grouped.reindex(lists.index).map(lambda x: x if isinstance(x, list) else [])
+
+
+TMDB_RELEASE_LIMITED = 2   # release_dates.type: 2 = Theatrical (limited)
+TMDB_RELEASE_WIDE    = 3   #                     3 = Theatrical
+
+
+def _us_release_dates(results: pd.Series) -> pd.DataFrame:
+    """release_dates.results por film → primera fecha US (YYYY-MM-DD) por tipo de estreno."""
+    countries = results.explode().dropna()
+    us    = countries[_field(countries, "iso_3166_1") == "US"]
+    dates = _field(us, "release_dates").explode().dropna()
+    flat  = pd.DataFrame({
+        "type": _field(dates, "type"),
+        "date": _field(dates, "release_date").map(lambda d: d[:10] if isinstance(d, str) else None),
+    })
+    wide = flat.groupby([flat.index, "type"])["date"].min().unstack()
+    return wide.reindex(index=results.index, columns=[TMDB_RELEASE_LIMITED, TMDB_RELEASE_WIDE])
+
+
+def extract_tmdb_details(payloads: list[dict]) -> pd.DataFrame:
+    """
+    Una pasada sobre todos los payloads de movie/{id} (con DETAILS_APPEND).
+    Cast / crew se recortan acá (top-5, director): el payload crudo queda entero en el lake.
+    La usa fetch_movie_details para un film y rebuild_from_lake.py para el lake entero.
+    """
+    raw = pd.DataFrame(payloads)
+    for col in [*TMDB_SCALARS, "genres", "credits", "external_ids", "imdb_id",
+                "production_companies", "keywords", "release_dates", "reviews"]:
+        if col not in raw.columns:
+            raw[col] = None
+
+    out = raw[list(TMDB_SCALARS)].rename(columns=TMDB_SCALARS)
+
+    ext_id  = _field(raw["external_ids"], "imdb_id")
+    imdb_id = ext_id.where(ext_id.notna() & (ext_id != ""), raw["imdb_id"])
+    out.insert(1, "imdb_id", imdb_id.where(imdb_id.notna() & (imdb_id != ""), None))
+
+    credits  = raw["credits"]
+    director = _names(_field(credits, "crew"), limit=1, job="Director")
+
+    out["genres"]               = _names(raw["genres"]).map(json.dumps)
+    out["director"]             = director.map(lambda d: d[0] if d else None)
+    out["cast_top5"]            = _names(_field(credits, "cast"), limit=5).map(json.dumps)
+    out["production_companies"] = _names(raw["production_companies"], limit=3).map(json.dumps)
+    out["keywords"]             = _names(_field(raw["keywords"], "keywords")).map(json.dumps)
+    out["tmdb_review_count"]    = _field(raw["reviews"], "total_results")
+
+    us = _us_release_dates(_field(raw["release_dates"], "results"))
+    out["us_limited_release"]   = us[TMDB_RELEASE_LIMITED]
+    out["us_wide_release"]      = us[TMDB_RELEASE_WIDE]
+    # estrategia típica de Oscar: limitado (qualifying run) antes que wide, o solo limitado
+    # comparar como fechas: una columna toda NaN es float y no se compara con str
+    limited = pd.to_datetime(out["us_limited_release"], errors="coerce")
+    wide    = pd.to_datetime(out["us_wide_release"], errors="coerce")
+    out["limited_before_wide"]  = (limited.notna() & ~(wide <= limited)).astype(int)
+
+    # mismo orden de columnas que siempre tuvo 01_tmdb.csv
+    return out[[
+        "tmdb_id", "imdb_id", "tmdb_title", "synopsis", "tagline", "budget", "revenue",
+        "runtime_min", "release_date", "original_language", "genres", "tmdb_popularity",
+        "tmdb_vote_avg", "tmdb_vote_count", "director", "cast_top5", "production_companies",
+        "keywords", "tmdb_review_count", "us_limited_release", "us_wide_release",
+        "limited_before_wide",
+    ]]
+
+
+def fetch_tmdb_row(ceremony_year: int, title: str, won: bool) -> dict:
+    """Search + details para un nominado → fila de 01_tmdb.csv."""
+    log.info(f"Fetching [{ceremony_year}] {title!r}")
+    tmdb_id = search_movie(title, ceremony_year)
+
+    row = {
+        "ceremony_year"   : ceremony_year,
+        "nominated_title" : title,
+        "won_best_picture": int(won),
     }
 
+    if tmdb_id:
+        try:
+            details = fetch_movie_details(tmdb_id)
+            row.update(details)
+        except CacheMiss:
+            raise   # --offline: un miss corta el run, no se guarda una fila sin details
+        except Exception as e:
+            log.error(f"Details failed para {title!r}: {e}")
+    else:
+        row["tmdb_id"] = None
+
+    return row
+
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
-def build_tmdb_df() -> pd.DataFrame:
+def build_tmdb_df(workers: int = 1, checkpoint_every: int = 1) -> pd.DataFrame:
     Path(DATA_DIR).mkdir(exist_ok=True)
     out_path = Path(DATA_DIR) / "01_tmdb.csv"
 
-    # resume support: saltea los ya fetcheados
-    if out_path.exists():
-        existing  = pd.read_csv(out_path)
-        done_keys = set(zip(existing["ceremony_year"], existing["nominated_title"]))
-        log.info(f"Resumiendo — {len(done_keys)} registros ya fetcheados")
-    else:
-        existing  = pd.DataFrame()
-        done_keys = set()
-
-    records = []
-    for ceremony_year, title, won in OSCAR_BEST_PICTURE:
-        if (ceremony_year, title) in done_keys:
-            continue
-
-        log.info(f"Fetching [{ceremony_year}] {title!r}")
-        tmdb_id = search_movie(title, ceremony_year)
-
-        row = {
-            "ceremony_year"   : ceremony_year,
-            "nominated_title" : title,
-            "won_best_picture": int(won),
-        }
-
-        if tmdb_id:
-            try:
-                details = fetch_movie_details(tmdb_id)
-                row.update(details)
-            except Exception as e:
-                log.error(f"Details failed para {title!r}: {e}")
-        else:
-            row["tmdb_id"] = None
+    partial  = partial_path(out_path)
 
-        records.append(row)
-        time.sleep(SLEEP)
+    # resume support: saltea los ya fetcheados (CSV + checkpoint de un run cortado)
+    existing = load_table("01_tmdb") if table_exists("01_tmdb") else pd.DataFrame()
+    done     = done_keys(existing, partial)
+    if done:
+        log.info(f"Resumiendo — {len(done)} registros ya fetcheados")
 
-    df_new = pd.DataFrame(records)
-    df = pd.concat([existing, df_new], ignore_index=True) if not existing.empty else df_new
-    df.to_csv(out_path, index=False)
-    log.info(f"Guardado {len(df)} filas -> {out_path}")
-    return df
+    pending = [
+        (ceremony_year, title, won)
+        for ceremony_year, title, won in OSCAR_BEST_PICTURE
+        if (ceremony_year, title) not in done
+    ]
+
+    with JsonlSink(partial, batch_size=checkpoint_every) as sink:
+        if workers > 1:
+            log.info(f"Modo concurrente: {workers} workers, {RATE_PER_SEC} req/s")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(fetch_tmdb_row, *args) for args in pending]
+                # al sink apenas termina cada film, sin esperar a los anteriores
+                for fut in as_completed(futures):
+                    sink.append(fut.result())
+        else:
+            for ceremony_year, title, won in pending:
+                # sin sleep fijo: _LIMITER pausa solo los requests que van a la red
+                sink.append(fetch_tmdb_row(ceremony_year, title, won))
+
+    # commit_csv reordena según OSCAR_BEST_PICTURE → mismo CSV en serial y concurrente
+    key_order = [(y, t) for y, t, _ in OSCAR_BEST_PICTURE]
+    return commit_csv(existing, partial, out_path, key_order)
 
 
 if __name__ == "__main__":
-    df = build_tmdb_df()
+    parser = argparse.ArgumentParser(description="Step 1 — TMDB enrichment")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="films en vuelo en paralelo (1 = modo serial)")
+    parser.add_argument("--offline", action="store_true",
+                        help="solo cache local, sin red (falla si falta algo)")
+    args = parser.parse_args()
+    set_offline(args.offline)
+
+    df = build_tmdb_df(workers=args.workers)
+    log.info(f"HTTP: {stats_summary()}")
     print(df[["ceremony_year", "nominated_title", "won_best_picture", "tmdb_id", "synopsis"]].head(10))
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Cache persistente de respuestas HTTP (SQLite) compartido por los fetchers.
+
+Key = sha256(url + params normalizados), sin la API key → el mismo request
+pega en el mismo registro aunque cambie la key o el orden de los params.
+
+  - TTL por fuente (TTLS): pasado el TTL el registro se ignora y se re-fetchea
+  - Tamaño acotado (MAX_BYTES): al pasarse se evictan los menos usados (LRU)
+  - Modo offline: solo se sirve desde el cache; un miss levanta CacheMiss
+
+Output: data/http_cache.sqlite
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import DATA_DIR
+
+DAY = 24 * 3600
+
+TTLS = {
+    "tmdb": 30 * DAY,
+    "omdb": 30 * DAY,
+    "wiki": 1 * DAY,   # las páginas de premios cambian durante la temporada
+}
+DEFAULT_TTL = 7 * DAY
+MAX_BYTES   = 512 * 1024 * 1024
+
+# params que nunca forman parte de la key (ni se guardan)
+SECRET_PARAMS = {"api_key", "apikey"}
+
+
+class CacheMiss(RuntimeError):
+    """Modo offline y el request no está en el cache."""
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    clean = {k: str(v) for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    raw = url + "?" + json.dumps(clean, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self, path: str | Path, max_bytes: int = MAX_BYTES):
+        self.path      = Path(path)
+        self.max_bytes = max_bytes
+        self.offline   = False
+        self.hits      = 0
+        self.misses    = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key         TEXT PRIMARY KEY,
+                    source      TEXT NOT NULL,
+                    url         TEXT NOT NULL,
+                    body        BLOB NOT NULL,
+                    size        INTEGER NOT NULL,
+                    fetched_at  REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)"
+            )
+        return self._conn
+
+    def lookup(self, source: str, url: str, params: dict | None = None) -> str | None:
+        """Body cacheado y vigente, o None. En modo offline ignora el TTL y un miss es error."""
+        key = cache_key(url, params)
+        now = time.time()
+        with self._lock:
+            db  = self._db()
+            row = db.execute(
+                "SELECT body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            fresh = row is not None and (
+                self.offline or now - row[1] < TTLS.get(source, DEFAULT_TTL)
+            )
+            if fresh:
+                db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                db.commit()
+                self.hits += 1
+                return row[0].decode("utf-8")
+            self.misses += 1
+
+        if self.offline:
+            raise CacheMiss(f"[offline] {source} no cacheado: {url} {params or ''}")
+        return None
+
+    def bodies(self, source: str) -> list[tuple[str, str]]:
+        """(url, body) de todo lo cacheado de una fuente, sin mirar TTL ni tocar last_access."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT url, body FROM responses WHERE source = ? ORDER BY url", (source,)
+            ).fetchall()
+        return [(url, body.decode("utf-8")) for url, body in rows]
+
+    def store(self, source: str, url: str, params: dict | None, body: str) -> None:
+        key  = cache_key(url, params)
+        blob = body.encode("utf-8")
+        now  = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source, url, blob, len(blob), now, now),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # LRU: borrar desde el acceso más viejo hasta quedar bajo el límite
+        to_free = total - self.max_bytes
+        victims = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+
+CACHE = ResponseCache(Path(DATA_DIR) / "http_cache.sqlite")
+
+
+def set_offline(offline: bool = True) -> None:
+    CACHE.offline = offline
@@ -0,0 +1,256 @@
+"""
+Cliente HTTP compartido por los fetchers (TMDB, OMDB, Wikipedia).
+
+Una sola sesión por proceso con pool de conexiones por host y keep-alive:
+cada request reusa la conexión TCP+TLS abierta en vez de pagar un
+handshake nuevo como hacía `requests.get` suelto.
+
+HTTP/2 es opcional (pip install "httpx[http2]"): con HTTP2=True y httpx
+disponible los requests a un mismo host se multiplexan sobre una conexión.
+Sin httpx se usa requests.Session sin cambios de comportamiento.
+
+get_with_retry suma la capa de resiliencia común a las tres fuentes:
+backoff exponencial con jitter, Retry-After, circuit breaker por host y
+contadores de reintentos (STATS / stats_summary).
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    _HTTPX_OK = True
+except ImportError:
+    _HTTPX_OK = False
+
+log = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = 8     # hosts distintos con pool propio
+POOL_MAXSIZE     = 16    # conexiones keep-alive por host (≥ workers concurrentes)
+TIMEOUT          = 10
+HTTP2            = False
+
+_session = None
+_lock    = threading.Lock()
+
+
+def configure(
+    pool_connections: int | None = None,
+    pool_maxsize: int | None = None,
+    timeout: float | None = None,
+    http2: bool | None = None,
+) -> None:
+    """Cambia la config del cliente; la sesión se recrea en el próximo request."""
+    global POOL_CONNECTIONS, POOL_MAXSIZE, TIMEOUT, HTTP2
+    if pool_connections is not None:
+        POOL_CONNECTIONS = pool_connections
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = pool_maxsize
+    if timeout is not None:
+        TIMEOUT = timeout
+    if http2 is not None:
+        HTTP2 = http2
+    close()
+
+
+def _build_session():
+    if HTTP2:
+        if _HTTPX_OK:
+            limits = httpx.Limits(
+                max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            )
+            return httpx.Client(http2=True, limits=limits, timeout=TIMEOUT,
+                                follow_redirects=True)
+        log.warning("HTTP2=True pero httpx no está instalado — usando requests")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close() -> None:
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def http_get(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float | None = None,
+):
+    """GET sobre la sesión compartida. Devuelve requests.Response o httpx.Response."""
+    return session().get(url, params=params, headers=headers,
+                         timeout=timeout if timeout is not None else TIMEOUT)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Resiliencia: retry con backoff + jitter, Retry-After, circuit breaker por host
+# ─────────────────────────────────────────────────────────────────────────────
+
+RETRY_STATUSES    = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS      = 5
+BACKOFF_BASE      = 0.5     # s; espera máx del intento n = BACKOFF_BASE * 2**n
+BACKOFF_MAX       = 30.0
+BREAKER_THRESHOLD = 5       # fallas seguidas que abren el circuito de un host
+BREAKER_COOLDOWN  = 60.0    # s que el host queda en pausa
+
+
+class RetriesExhausted(RuntimeError):
+    """get_with_retry agotó MAX_ATTEMPTS sin una respuesta válida."""
+
+
+_TRANSIENT_ERRORS: tuple = (requests.ConnectionError, requests.Timeout)
+if _HTTPX_OK:
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+
+# lo que puede levantar get_with_retry por la red (4xx, reintentos agotados, ...);
+# no incluye http_cache.CacheMiss, que en --offline tiene que cortar el run
+REQUEST_ERRORS: tuple = (requests.RequestException, RetriesExhausted)
+if _HTTPX_OK:
+    REQUEST_ERRORS += (httpx.HTTPError,)
+
+STATS: Counter = Counter()   # "<host> retries", "<host> breaker_trips", ...
+_stats_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        STATS[key] += 1
+
+
+class CircuitBreaker:
+    """Tras BREAKER_THRESHOLD fallas seguidas pausa el host BREAKER_COOLDOWN segundos."""
+
+    def __init__(self, host: str, threshold: int = BREAKER_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.host      = host
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self._failures   = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            remaining = self._open_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.threshold:
+                return
+            self._failures   = 0
+            self._open_until = time.monotonic() + self.cooldown
+        _count(f"{self.host} breaker_trips")
+        log.warning(f"Circuit breaker abierto para {self.host} — pausa {self.cooldown:.0f}s")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def _breaker(host: str) -> CircuitBreaker:
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def _retry_after(resp) -> float | None:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:   # formato HTTP-date
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+def get_with_retry(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float | None = None,
+    limiter=None,
+):
+    """
+    http_get con la política común a TMDB, OMDB y Wikipedia:
+      - reintenta errores de red, 429 y 5xx con backoff exponencial + full jitter
+      - respeta Retry-After (y pausa el `limiter` de la fuente, si hay uno)
+      - circuit breaker por host: una fuente caída se pausa en vez de martillarla
+    Tras el último intento fallido levanta sin backoff ni pausa del limiter.
+    Otros 4xx se levantan de inmediato con raise_for_status.
+    """
+    host    = urlparse(url).netloc
+    breaker = _breaker(host)
+
+    for attempt in range(MAX_ATTEMPTS):
+        breaker.wait()
+        if limiter is not None:
+            limiter.acquire()
+
+        wait = None
+        try:
+            resp = http_get(url, params=params, headers=headers, timeout=timeout)
+        except _TRANSIENT_ERRORS as e:
+            log.warning(f"{host}: {type(e).__name__} (intento {attempt + 1}/{MAX_ATTEMPTS})")
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                breaker.success()
+                resp.raise_for_status()
+                return resp
+            wait = _retry_after(resp)
+            log.warning(f"{host}: HTTP {resp.status_code} (intento {attempt + 1}/{MAX_ATTEMPTS})")
+
+        breaker.failure()
+        if attempt == MAX_ATTEMPTS - 1:
+            break   # último intento: levantar ya, sin esperar ni pausar a los demás workers
+        _count(f"{host} retries")
+        if wait is None:
+            wait = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        if limiter is not None:
+            # pausa el bucket de la fuente: frena a todos sus workers, no solo a este
+            limiter.pause(wait)
+        else:
+            time.sleep(wait)
+
+    _count(f"{host} failures")
+    raise RetriesExhausted(f"Failed after retries: {url}")
+
+
+def stats_summary() -> str:
+    with _stats_lock:
+        return ", ".join(f"{k}={v}" for k, v in sorted(STATS.items())) or "sin reintentos"
@@ -372,6 +372,16 @@ OSCAR_BEST_PICTURE: list[tuple[int, str, bool]] = [
     (2026, "Train Dreams", False),
 ]
 
+# ── IDs fijados a mano ───────────────────────────────────────────────────────
+# (ceremony_year, film_title) → IDs que saltean la búsqueda por título.
+# Para remakes y títulos ambiguos donde search/movie devuelve el film equivocado.
+ID_OVERRIDES: dict[tuple[int, str], dict[str, int | str]] = {
+    (2022, "West Side Story"): {"tmdb_id": 511809, "imdb_id": "tt3581652"},
+    (2020, "Little Women")   : {"tmdb_id": 331482, "imdb_id": "tt3281548"},
+    (2019, "A Star Is Born") : {"tmdb_id": 332562, "imdb_id": "tt1517451"},
+    (2006, "Crash")          : {"tmdb_id": 1640,   "imdb_id": "tt0375679"},
+}
+
 if __name__ == "__main__":
     import pandas as pd
     df = pd.DataFrame(OSCAR_BEST_PICTURE, columns=["ceremony_year", "nominated_title", "won_best_picture"])
@@ -0,0 +1,157 @@
+"""
+Pipeline streaming — Steps 1, 2 y 3 en paralelo
+
+  TMDB workers ──(queue acotada)──> OMDB workers
+  Awards season scraper (thread propio)
+
+Cada film pasa a OMDB apenas se resuelve en TMDB, sin esperar a que
+exista data/01_tmdb.csv; la queue acotada frena a TMDB si OMDB se atrasa.
+El tiempo total queda cerca del stage más lento, no de la suma.
+
+Respeta el resume y el checkpoint de cada step: films ya en 01_tmdb.csv
+(o en su .partial.jsonl) no se re-fetchean en TMDB, y los que falten en
+02_omdb.csv se encolan directo para OMDB.
+
+Output: data/01_tmdb, 02_omdb, 03_awards_season (.parquet + .csv)
+Uso:    python pipeline.py [--tmdb-workers N] [--omdb-workers N] [--offline]
+"""
+
+import argparse
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from config import DATA_DIR, YEARS
+from nominees_ground_truth import OSCAR_BEST_PICTURE
+from fetch_tmdb import fetch_tmdb_row
+from fetch_omdb import fetch_omdb_row
+from fetch_awards_season import build_awards_season_df
+from http_cache import set_offline
+from http_client import stats_summary
+from checkpoint import JsonlSink, commit_csv, done_keys, load_records, partial_path
+from storage import load_table, table_exists
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+_DONE = object()   # sentinel: no hay más films para OMDB
+
+
+def run_streaming(
+    years: list[int],
+    tmdb_workers: int = 4,
+    omdb_workers: int = 2,
+    queue_size: int = 32,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    data_dir = Path(DATA_DIR)
+    data_dir.mkdir(exist_ok=True)
+    tmdb_path = data_dir / "01_tmdb.csv"
+    omdb_path = data_dir / "02_omdb.csv"
+
+    tmdb_partial = partial_path(tmdb_path)
+    omdb_partial = partial_path(omdb_path)
+
+    tmdb_existing = load_table("01_tmdb") if table_exists("01_tmdb") else pd.DataFrame()
+    omdb_existing = load_table("02_omdb") if table_exists("02_omdb") else pd.DataFrame()
+    tmdb_done     = done_keys(tmdb_existing, tmdb_partial)
+    omdb_done     = done_keys(omdb_existing, omdb_partial)
+
+    to_omdb: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors: list[Exception] = []
+
+    def omdb_worker(sink: JsonlSink) -> None:
+        while True:
+            row = to_omdb.get()
+            if row is _DONE:
+                return
+            key = (row["ceremony_year"], row["nominated_title"])
+            try:
+                sink.append(fetch_omdb_row(row))
+            except Exception as e:
+                # seguir drenando la queue: si no, TMDB queda bloqueado en put()
+                log.error(f"OMDB failed para {key}: {e}")
+                errors.append(e)
+
+    def tmdb_task(sink: JsonlSink, args: tuple) -> None:
+        ceremony_year, title, won = args
+        try:
+            row = fetch_tmdb_row(ceremony_year, title, won)
+            sink.append(row)
+        except Exception as e:
+            # como en OMDB: loguear y seguir con el resto; se re-lanza al final
+            log.error(f"TMDB failed para {(ceremony_year, title)}: {e}")
+            errors.append(e)
+            return
+        if (ceremony_year, title) not in omdb_done:
+            to_omdb.put(row)
+
+    with ThreadPoolExecutor(max_workers=1) as awards_pool, \
+         JsonlSink(tmdb_partial) as tmdb_sink, \
+         JsonlSink(omdb_partial) as omdb_sink:
+        awards_future = awards_pool.submit(build_awards_season_df, years)
+
+        consumers = [threading.Thread(target=omdb_worker, args=(omdb_sink,), daemon=True)
+                     for _ in range(omdb_workers)]
+        for t in consumers:
+            t.start()
+
+        try:
+            # films con TMDB ya fetcheado pero sin OMDB (run anterior interrumpido)
+            tmdb_rows = tmdb_existing.to_dict("records") + load_records(tmdb_partial)
+            for row in tmdb_rows:
+                if (row["ceremony_year"], row["nominated_title"]) not in omdb_done:
+                    to_omdb.put(row)
+
+            pending = [
+                (ceremony_year, title, won)
+                for ceremony_year, title, won in OSCAR_BEST_PICTURE
+                if (ceremony_year, title) not in tmdb_done
+            ]
+            log.info(f"Streaming: {len(pending)} films TMDB → OMDB "
+                     f"({tmdb_workers} + {omdb_workers} workers)")
+            with ThreadPoolExecutor(max_workers=tmdb_workers) as tmdb_pool:
+                list(tmdb_pool.map(lambda args: tmdb_task(tmdb_sink, args), pending))
+        finally:
+            # pase lo que pase, los consumers terminan antes de cerrar omdb_sink
+            for _ in consumers:
+                to_omdb.put(_DONE)
+            for t in consumers:
+                t.join()
+
+        awards_df = awards_future.result()
+
+    if errors:
+        raise errors[0]
+
+    # mismo orden que los steps seriales: existentes + nuevos en orden de OSCAR_BEST_PICTURE
+    tmdb_df = commit_csv(
+        tmdb_existing, tmdb_partial, tmdb_path,
+        [(y, t) for y, t, _ in OSCAR_BEST_PICTURE],
+    )
+    omdb_df = commit_csv(
+        omdb_existing, omdb_partial, omdb_path,
+        list(zip(tmdb_df["ceremony_year"], tmdb_df["nominated_title"])),
+    )
+    return tmdb_df, omdb_df, awards_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Steps 1-3 en modo streaming")
+    parser.add_argument("--tmdb-workers", type=int, default=4)
+    parser.add_argument("--omdb-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="films resueltos en TMDB esperando a OMDB")
+    parser.add_argument("--offline", action="store_true",
+                        help="solo cache local, sin red (falla si falta algo)")
+    args = parser.parse_args()
+    set_offline(args.offline)
+
+    tmdb_df, omdb_df, awards_df = run_streaming(
+        YEARS, args.tmdb_workers, args.omdb_workers, args.queue_size,
+    )
+    log.info(f"HTTP: {stats_summary()}")
+    print(f"TMDB={tmdb_df.shape}  OMDB={omdb_df.shape}  Awards={awards_df.shape}")
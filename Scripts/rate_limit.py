@@ -0,0 +1,53 @@
+"""
+Token-bucket rate limiter compartido entre threads.
+
+Un único bucket por API: todos los workers de un fetch concurrente
+llaman a `acquire()` antes de cada request, y un 429 con Retry-After
+pausa el bucket entero (no solo al worker que lo recibió).
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    rate  = tokens repuestos por segundo (requests/s sostenidos)
+    burst = capacidad máxima del bucket (requests permitidos en ráfaga)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate   = float(rate)
+        self.burst  = max(1, int(burst))
+        self._tokens       = float(self.burst)
+        self._last         = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last   = now
+
+    def acquire(self) -> None:
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After: nadie saca tokens hasta que pase `seconds`; el bucket arranca vacío."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._last   = until
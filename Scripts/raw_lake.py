@@ -0,0 +1,101 @@
+"""
+Lake de respuestas crudas (TMDB details, OMDB) comprimidas.
+
+Cada payload JSON completo se guarda en data/lake/<source>.jsonl.zst
+(o .jsonl.gz si zstandard no está instalado) keyed por tmdb_id / imdb_id.
+Sumar un campo nuevo al dataset es re-parsear el lake con
+rebuild_from_lake.py, sin volver a pegarle a las APIs.
+
+Los fetchers appendean solo lo que bajan de la red; un hit del cache HTTP
+ya está en el lake desde la primera corrida.
+
+Formato: JSONL append-only, un frame comprimido por batch; si la misma key
+aparece más de una vez gana la última.
+"""
+
+import atexit
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import zstandard
+    _ZSTD_OK = True
+except ImportError:
+    _ZSTD_OK = False
+
+from config import DATA_DIR
+
+LAKE_DIR   = Path(DATA_DIR) / "lake"
+BATCH_SIZE = 50
+
+
+class RawLake:
+
+    def __init__(self, source: str, batch_size: int = BATCH_SIZE):
+        self.source     = source
+        self.batch_size = batch_size
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @property
+    def path(self) -> Path:
+        ext = "zst" if _ZSTD_OK else "gz"
+        return LAKE_DIR / f"{self.source}.jsonl.{ext}"
+
+    def append(self, key: str | int, payload: dict) -> None:
+        line = json.dumps({"key": key, "fetched_at": time.time(), "payload": payload},
+                          ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = ("\n".join(self._buffer) + "\n").encode("utf-8")
+        # zstd frames / gzip members concatenados siguen siendo un stream válido
+        frame = zstandard.ZstdCompressor(level=10).compress(data) if _ZSTD_OK else gzip.compress(data)
+        LAKE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as fh:
+            fh.write(frame)
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._buffer.clear()
+
+    def _iter_lines(self):
+        gz_path  = LAKE_DIR / f"{self.source}.jsonl.gz"
+        zst_path = LAKE_DIR / f"{self.source}.jsonl.zst"
+        if gz_path.exists():
+            with gzip.open(gz_path, "rt", encoding="utf-8") as fh:
+                yield from fh
+        if zst_path.exists():
+            if not _ZSTD_OK:
+                raise RuntimeError(f"{zst_path} requiere zstandard (pip install zstandard)")
+            with open(zst_path, "rb") as raw:
+                reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+                yield from io.TextIOWrapper(reader, encoding="utf-8")
+
+    def load(self) -> dict:
+        """key → último payload guardado (incluye lo que siga en el buffer)."""
+        self.flush()
+        payloads = {}
+        for line in self._iter_lines():
+            if line.strip():
+                rec = json.loads(line)
+                payloads[rec["key"]] = rec["payload"]
+        return payloads
+
+
+TMDB_LAKE = RawLake("tmdb_details")
+OMDB_LAKE = RawLake("omdb")
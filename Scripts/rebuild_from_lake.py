@@ -0,0 +1,83 @@
+"""
+Re-parseo local: reconstruye 01_tmdb / 02_omdb (Parquet + CSV) desde el lake crudo
+(data/lake/) sin pegarle a ninguna API.
+
+Las keys de cada fila (ceremony_year, nominated_title, tmdb_id / imdb_id)
+salen del CSV actual; todas las demás columnas se vuelven a extraer de los
+payloads guardados con extract_tmdb_details / extract_omdb, en una pasada.
+Sumar un campo nuevo = agregarlo al extractor y correr esto.
+
+Filas cuyo payload no está en el lake (fetcheadas antes de que existiera)
+se dejan como estaban.
+
+Uso: python rebuild_from_lake.py [--only tmdb|omdb]
+"""
+
+import argparse
+import logging
+
+import pandas as pd
+
+from config import DATA_DIR
+from raw_lake import TMDB_LAKE, OMDB_LAKE
+from storage import load_table, save_table
+from fetch_tmdb import extract_tmdb_details
+from fetch_omdb import extract_omdb
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+
+def _splice(current: pd.DataFrame, extracted: pd.DataFrame, id_col: str, keep: list[str]) -> pd.DataFrame:
+    """Reemplaza las filas con payload en el lake por su versión re-extraída."""
+    has_payload = current[id_col].isin(extracted[id_col])
+    rebuilt = (
+        current.loc[has_payload, keep + [id_col]]
+               .reset_index()
+               .merge(extracted, on=id_col, how="left")
+               .set_index("index")
+    )
+    log.info(f"{id_col}: {has_payload.sum()} filas re-extraídas, "
+             f"{(~has_payload).sum()} sin payload en el lake (sin cambios)")
+    df = pd.concat([rebuilt, current.loc[~has_payload]]).sort_index()
+    df.index.name = None
+    return df
+
+
+def rebuild_tmdb_csv() -> pd.DataFrame:
+    current = load_table("01_tmdb")
+
+    payloads  = TMDB_LAKE.load()
+    ids       = [i for i in current["tmdb_id"].dropna().unique() if int(i) in payloads]
+    extracted = extract_tmdb_details([payloads[int(i)] for i in ids])
+    extracted["tmdb_id"] = extracted["tmdb_id"].astype("Int64")
+
+    df = _splice(current, extracted, "tmdb_id",
+                 ["ceremony_year", "nominated_title", "won_best_picture"])
+    df = save_table(df, "01_tmdb")
+    log.info(f"Guardado {len(df)} filas -> {DATA_DIR}/01_tmdb")
+    return df
+
+
+def rebuild_omdb_csv() -> pd.DataFrame:
+    current = load_table("02_omdb")
+
+    payloads  = OMDB_LAKE.load()
+    ids       = [i for i in current["imdb_id"].dropna().unique() if i in payloads]
+    extracted = extract_omdb([payloads[i] for i in ids])
+
+    df = _splice(current, extracted, "imdb_id", ["ceremony_year", "nominated_title"])
+    df = save_table(df, "02_omdb")
+    log.info(f"Guardado {len(df)} filas -> {DATA_DIR}/02_omdb")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye los CSV de TMDB/OMDB desde el lake")
+    parser.add_argument("--only", choices=["tmdb", "omdb"])
+    args = parser.parse_args()
+
+    if args.only in (None, "tmdb"):
+        rebuild_tmdb_csv()
+    if args.only in (None, "omdb"):
+        rebuild_omdb_csv()
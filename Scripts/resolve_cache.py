@@ -0,0 +1,102 @@
+"""
+Helpers para la resolución título → ID (TMDB / OMDB).
+
+  - NegativeCache: misses persistidos con vencimiento, para no repetir
+    todo el fan-out de búsquedas en cada run por films que no aparecen
+  - SingleFlight: lookups idénticos en vuelo se coalescen en una sola llamada
+
+Los IDs fijados a mano viven en nominees_ground_truth.ID_OVERRIDES.
+
+Output: data/negative_cache.json (editable a mano: borrar una key la re-intenta)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from config import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+NEGATIVE_TTL = 14 * 24 * 3600
+
+
+class NegativeCache:
+
+    def __init__(self, path: str | Path, ttl: float = NEGATIVE_TTL):
+        self.path = Path(path)
+        self.ttl  = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, float] | None = None
+
+    @staticmethod
+    def _key(source: str, ceremony_year: int, title: str) -> str:
+        return f"{source}|{int(ceremony_year)}|{title}"
+
+    def _load(self) -> dict[str, float]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+        return self._entries
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def is_miss(self, source: str, ceremony_year: int, title: str) -> bool:
+        with self._lock:
+            ts = self._load().get(self._key(source, ceremony_year, title))
+        return ts is not None and time.time() - ts < self.ttl
+
+    def add(self, source: str, ceremony_year: int, title: str) -> None:
+        with self._lock:
+            self._load()[self._key(source, ceremony_year, title)] = time.time()
+            self._save()
+
+    def discard(self, source: str, ceremony_year: int, title: str) -> None:
+        with self._lock:
+            if self._load().pop(self._key(source, ceremony_year, title), None) is not None:
+                self._save()
+
+
+class SingleFlight:
+    """`do(key, fn)`: si ya hay una llamada en vuelo con esa key, espera su resultado."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, tuple[threading.Event, list]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), [None, None])   # [result, exception]
+                self._calls[key] = call
+        event, box = call
+
+        if not leader:
+            event.wait()
+        else:
+            try:
+                box[0] = fn()
+            except Exception as e:
+                box[1] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                event.set()
+
+        if box[1] is not None:
+            raise box[1]
+        return box[0]
+
+
+NEGATIVE = NegativeCache(Path(DATA_DIR) / "negative_cache.json")
@@ -0,0 +1,136 @@
+"""
+Matriz de entrenamiento publicada una vez en memoria compartida para workers.
+
+Con trials de Optuna o refits del permutation test repartidos en procesos,
+cada worker recibiría por pickle su propia copia de X (o la reconstruiría
+desde el DataFrame). Acá el proceso padre copia X / y / years una sola vez
+a un bloque de multiprocessing.shared_memory y los workers reciben solo un
+MatrixHandle (nombre + shapes, unos cientos de bytes): attach() devuelve
+vistas numpy sobre el mismo bloque, sin copia. Memoria y arranque por
+worker quedan planos aunque crezca la cantidad de workers.
+
+Uso:
+    with SharedMatrix.publish(X, y, years) as shared:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(4, initializer=init_worker, initargs=(shared.handle,)) as pool:
+            pool.map(run_trial, params)
+    # en el worker: X, y, years = worker_matrix()
+"""
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+ALIGN = 64   # cada array arranca alineado a una línea de cache
+
+
+@dataclass(frozen=True)
+class MatrixHandle:
+    name  : str                                    # nombre del bloque shared_memory
+    arrays: tuple[tuple[str, str, tuple, int], ...]  # (campo, dtype, shape, offset)
+
+
+class SharedMatrix:
+    """
+    X / y / years sobre un bloque de shared memory. El dueño lo libera con
+    unlink() (o saliendo del with); antes hay que soltar las vistas X / y.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: MatrixHandle, owner: bool):
+        self._shm   = shm
+        self.handle = handle
+        self.owner  = owner
+        self.arrays = {
+            field: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for field, dtype, shape, offset in handle.arrays
+        }
+        for arr in self.arrays.values():
+            arr.flags.writeable = owner
+
+    @property
+    def X(self) -> np.ndarray:
+        return self.arrays["X"]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.arrays["y"]
+
+    @property
+    def years(self) -> np.ndarray | None:
+        return self.arrays.get("years")
+
+    @classmethod
+    def publish(cls, X, y, years=None) -> "SharedMatrix":
+        """Copia los arrays (una vez) a un bloque nuevo; X queda float32 C-contiguo."""
+        fields = {"X": np.ascontiguousarray(X, dtype=np.float32), "y": np.asarray(y)}
+        if years is not None:
+            fields["years"] = np.asarray(years)
+
+        layout, size = [], 0
+        for field, arr in fields.items():
+            size = -(-size // ALIGN) * ALIGN
+            layout.append((field, arr.dtype.str, arr.shape, size))
+            size += arr.nbytes
+
+        shm    = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared = cls(shm, MatrixHandle(shm.name, tuple(layout)), owner=True)
+        for field, arr in fields.items():
+            shared.arrays[field][...] = arr
+        return shared
+
+    @classmethod
+    def from_feature_matrix(cls, fm, years=None) -> "SharedMatrix":
+        """Publica los años pedidos de un feature_store.FeatureMatrix."""
+        X, y = fm.matrix(years)
+        return cls.publish(X, y, fm.year_index(years))
+
+    @classmethod
+    def attach(cls, handle: MatrixHandle) -> "SharedMatrix":
+        """Del lado del worker: mapea el bloque por nombre, solo lectura."""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        else:
+            # antes de 3.13 attach también registra el bloque en el resource_tracker,
+            # que lo borraría cuando sale el worker: se saltea el registro
+            register, resource_tracker.register = resource_tracker.register, lambda *a: None
+            try:
+                shm = shared_memory.SharedMemory(name=handle.name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, handle, owner=False)
+
+    def close(self) -> None:
+        self.arrays.clear()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedMatrix":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.unlink()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Lado del worker (initializer de Pool / ProcessPoolExecutor)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_WORKER: SharedMatrix | None = None
+
+
+def init_worker(handle: MatrixHandle) -> None:
+    global _WORKER
+    _WORKER = SharedMatrix.attach(handle)
+
+
+def worker_matrix() -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """(X, y, years) del bloque compartido del worker."""
+    if _WORKER is None:
+        raise RuntimeError("init_worker() no corrió en este proceso")
+    return _WORKER.X, _WORKER.y, _WORKER.years
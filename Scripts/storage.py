@@ -0,0 +1,454 @@
+"""
+Storage tipado de los intermedios del pipeline.
+
+Cada tabla (01_tmdb, 02_omdb, 03_awards_season, master_dataset) tiene un
+schema declarado acá y se guarda en dos formatos:
+  data/<tabla>.parquet  fuente de verdad: tipos nativos, listas como
+                        list<string> (requiere pyarrow, opcional)
+  data/<tabla>.csv      export para humanos / notebooks viejos: listas
+                        como JSON, igual que siempre
+  data/<tabla>/ceremony_year=YYYY/part-0.parquet
+                        solo tablas de PARTITIONED (master_dataset): hive
+                        por año, para leer una temporada sin tocar el resto
+
+load_table() lee el Parquet si existe y si no cae al CSV; en ambos casos
+devuelve el mismo DataFrame tipado (listas ya parseadas), así que los
+consumidores no re-infieren dtypes ni re-parsean JSON. load_compact() es el
+master con el schema compacto de COMPACT (categoricals, flags int8, scores
+float32) para análisis en memoria.
+
+Uso: python storage.py   (convierte los CSV existentes y compara tiempos de carga)
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    _ARROW_OK = True
+except ImportError:
+    _ARROW_OK = False
+
+try:
+    from config import DATA_DIR
+except ImportError:
+    from Scripts.config import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+LIST = "list"   # list<string>
+DATE = "date"   # datetime64, YYYY-MM-DD en el CSV
+
+DATE_DTYPE = "datetime64[ns]"   # unidad fija: CSV y Parquet devuelven lo mismo
+
+_KEYS = {"ceremony_year": "int64", "nominated_title": "str"}
+
+_TMDB = {
+    **_KEYS,
+    "won_best_picture"    : "int64",
+    "tmdb_id"             : "Int64",
+    "imdb_id"             : "str",
+    "tmdb_title"          : "str",
+    "synopsis"            : "str",
+    "tagline"             : "str",
+    "budget"              : "Int64",
+    "revenue"             : "Int64",
+    "runtime_min"         : "Int64",
+    "release_date"        : DATE,
+    "original_language"   : "str",
+    "genres"              : LIST,
+    "tmdb_popularity"     : "float64",
+    "tmdb_vote_avg"       : "float64",
+    "tmdb_vote_count"     : "Int64",
+    "director"            : "str",
+    "cast_top5"           : LIST,
+    "production_companies": LIST,
+    "keywords"            : LIST,
+    "tmdb_review_count"   : "Int64",
+    "us_limited_release"  : DATE,
+    "us_wide_release"     : DATE,
+    "limited_before_wide" : "Int64",
+}
+
+_OMDB = {
+    **_KEYS,
+    "imdb_id"       : "str",
+    "imdb_rating"   : "float64",
+    "imdb_votes"    : "Int64",
+    "metacritic"    : "Int64",
+    "rt_score"      : "Int64",
+    "box_office_usd": "Int64",
+    "rated"         : "str",
+    "omdb_awards"   : "str",
+    "country"       : "str",
+    "language"      : "str",
+}
+
+_FEATURES = {
+    "budget_m"            : "float64",
+    "revenue_m"           : "float64",
+    "log_budget"          : "float64",
+    "log_revenue"         : "float64",
+    "roi"                 : "float64",
+    "log_imdb_votes"      : "float64",
+    "release_month"       : "float64",
+    "is_q4_release"       : "int64",
+    "is_english"          : "int64",
+    "main_language"       : "str",
+    "total_precursor_wins": "int64",
+    "total_precursor_noms": "int64",
+    "omdb_oscar_wins"     : "int64",
+    "days_to_ceremony"    : "float64",
+    "main_genre"          : "str",
+    "rt_norm"             : "float64",
+    "imdb_norm"           : "float64",
+    "metacritic_norm"     : "float64",
+    "critic_composite"    : "float64",
+}
+
+SCHEMAS: dict[str, dict[str, str]] = {
+    "01_tmdb"         : _TMDB,
+    "02_omdb"         : _OMDB,
+    "03_awards_season": {"ceremony_year": "int64", "film": "str"},
+    # en el master los enteros con faltantes van como float64 (lo que esperan
+    # el modelo y scrolly, y lo que siempre infirió read_csv)
+    "master_dataset"  : {
+        col: "float64" if kind == "Int64" else kind
+        for col, kind in {**_TMDB, **_OMDB, **_FEATURES}.items()
+    },
+}
+
+# columnas que dependen del registro de premios / de TOP_GENRES
+PATTERNS = [
+    (lambda c: c.endswith("_won") or c.endswith("_nominated"), "int64"),
+    (lambda c: c.startswith("genre_"),                         "int64"),
+]
+
+
+def column_type(table: str, col: str) -> str | None:
+    declared = SCHEMAS[table].get(col)
+    if declared:
+        return declared
+    for matches, kind in PATTERNS:
+        if matches(col):
+            return kind
+    return None
+
+
+def _as_list(value) -> list:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str) and value:
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return []
+        return parsed if isinstance(parsed, list) else []
+    return []
+
+
+def _coerce(values: pd.Series, kind: str) -> pd.Series:
+    if kind == LIST:
+        return values.map(_as_list).astype(object)
+    if kind == DATE:
+        return pd.to_datetime(values, errors="coerce").astype(DATE_DTYPE)
+    if kind == "str":
+        return values.astype("str").where(values.notna())
+    if kind in ("int64", "Int64", "float64"):
+        return pd.to_numeric(values, errors="coerce").astype(kind)
+    return values.astype(kind)
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Castea cada columna declarada a su tipo; las no declaradas quedan como vienen."""
+    df = df.copy()
+    for col in df.columns:
+        kind = column_type(table, col)
+        if kind is not None:
+            df[col] = _coerce(df[col], kind)
+    return df
+
+
+def _arrow_table(df: pd.DataFrame, table: str) -> "pa.Table":
+    """Tabla Arrow con los tipos del schema (listas → list<string>, fechas → date32)."""
+    arrow = pa.Table.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in arrow.schema:
+        kind = column_type(table, field.name)
+        if kind == LIST:
+            field = field.with_type(pa.list_(pa.string()))
+        elif kind == DATE:
+            field = field.with_type(pa.date32())
+        fields.append(field)
+    return arrow.cast(pa.schema(fields, metadata=arrow.schema.metadata))
+
+
+def _to_csv_frame(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    out = df.copy()
+    for col in out.columns:
+        kind = column_type(table, col)
+        if kind == LIST:
+            out[col] = out[col].map(json.dumps)
+        elif kind == DATE:
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+    return out
+
+
+def row_hashes(df: pd.DataFrame, table: str) -> np.ndarray:
+    """
+    Hash uint64 del contenido de cada fila (no del índice), estable entre
+    Parquet y CSV: listas y fechas se hashean en su forma de texto.
+    """
+    return pd.util.hash_pandas_object(_to_csv_frame(df, table), index=False).to_numpy()
+
+
+def _replace(path: Path, write) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Layout particionado: data/<tabla>/ceremony_year=YYYY/part-0.parquet
+# ─────────────────────────────────────────────────────────────────────────────
+
+PARTITION_COL = "ceremony_year"
+ORDER_COL     = "_row_order"   # orden original de las filas (el dataset se lee por año)
+PARTITIONED   = {"master_dataset"}   # sumar "01_tmdb", "02_omdb", ... para particionar los stages
+
+
+def _dataset_dir(table: str, data_dir: Path) -> Path:
+    return data_dir / table
+
+
+def _write_partitions(arrow: "pa.Table", path: Path, only: set[int] | None = None) -> set[int]:
+    """
+    Un Parquet por año (sin la columna de partición, va en el path); `only`
+    limita a esos años. Devuelve todos los años presentes en `arrow`.
+    """
+    years = set(arrow.column(PARTITION_COL).to_pylist())
+    body  = arrow.drop_columns([PARTITION_COL])
+    for year in sorted(years if only is None else years & only):
+        part = path / f"{PARTITION_COL}={year}"
+        part.mkdir(parents=True, exist_ok=True)
+        rows = body.filter(pc.equal(arrow.column(PARTITION_COL), year))
+        _replace(part / "part-0.parquet", lambda p: pq.write_table(rows, p))
+    return years
+
+
+def _read_dataset(path: Path, columns: list[str] | None, years: list[int] | None) -> "pa.Table":
+    partitioning = ds.partitioning(pa.schema([(PARTITION_COL, pa.int64())]), flavor="hive")
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+    wanted  = None if columns is None else list(dict.fromkeys([*columns, ORDER_COL]))
+    where   = None if years is None else ds.field(PARTITION_COL).isin([int(y) for y in years])
+    arrow   = dataset.to_table(columns=wanted, filter=where)   # solo abre las particiones pedidas
+
+    arrow = arrow.sort_by(ORDER_COL).drop_columns([ORDER_COL])
+    names = columns or [PARTITION_COL, *[n for n in arrow.column_names if n != PARTITION_COL]]
+    return arrow.select(names)
+
+
+def save_table(
+    df: pd.DataFrame,
+    table: str,
+    data_dir: str | Path = DATA_DIR,
+    years: set[int] | None = None,
+) -> pd.DataFrame:
+    """
+    Valida contra el schema y escribe Parquet (si hay pyarrow) + CSV, ambos
+    atómicos. Las tablas de PARTITIONED además van a un dataset hive por
+    ceremony_year (lecturas por año); el Parquet plano queda para leer todo
+    de una, que con un archivo por año sería más lento.
+
+    years: solo reescribe esas particiones. Vale cuando el resto de las filas
+    no cambió ni de contenido ni de posición (build incremental sin altas/bajas).
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    df = apply_schema(df, table)
+
+    if _ARROW_OK:
+        arrow = _arrow_table(df, table)
+        _replace(data_dir / f"{table}.parquet", lambda p: pq.write_table(arrow, p))
+    if _ARROW_OK and table in PARTITIONED:
+        path  = _dataset_dir(table, data_dir)
+        present = _write_partitions(arrow.append_column(ORDER_COL, pa.array(np.arange(len(df)))),
+                                    path, None if years is None else {int(y) for y in years})
+        for stale in path.glob(f"{PARTITION_COL}=*"):
+            if int(stale.name.split("=", 1)[1]) not in present:
+                shutil.rmtree(stale)
+    _replace(data_dir / f"{table}.csv",
+             lambda p: _to_csv_frame(df, table).to_csv(p, index=False))
+    return df
+
+
+def table_exists(table: str, data_dir: str | Path = DATA_DIR) -> bool:
+    data_dir = Path(data_dir)
+    return any(p.exists() for p in (
+        _dataset_dir(table, data_dir), data_dir / f"{table}.parquet", data_dir / f"{table}.csv",
+    ))
+
+
+def _from_arrow(arrow: "pa.Table", table: str) -> pd.DataFrame:
+    df = arrow.to_pandas()
+    for col in df.columns:
+        kind = column_type(table, col)
+        if kind == LIST:
+            # to_pylist arma las listas en C; to_pandas daría ndarrays
+            df[col] = pd.Series([v or [] for v in arrow.column(col).to_pylist()],
+                                index=df.index, dtype=object)
+        elif kind == DATE:
+            df[col] = df[col].astype(DATE_DTYPE)
+    return df
+
+
+def load_table(
+    table: str,
+    columns: list[str] | None = None,
+    years: list[int] | None = None,
+    data_dir: str | Path = DATA_DIR,
+) -> pd.DataFrame:
+    """
+    DataFrame tipado desde el Parquet o, si no hay, desde el CSV.
+    `years` / `columns` se empujan al reader: con el dataset particionado
+    load_table("master_dataset", years=[2026]) lee un solo archivo chico.
+    """
+    data_dir = Path(data_dir)
+    dataset  = _dataset_dir(table, data_dir)
+    parquet  = data_dir / f"{table}.parquet"
+
+    if _ARROW_OK and dataset.exists() and (years is not None or not parquet.exists()):
+        return _from_arrow(_read_dataset(dataset, columns, years), table)
+    if _ARROW_OK and parquet.exists():
+        filters = None if years is None else [(PARTITION_COL, "in", [int(y) for y in years])]
+        return _from_arrow(pq.read_table(parquet, columns=columns, filters=filters), table)
+
+    usecols = columns
+    if columns is not None and years is not None and PARTITION_COL not in columns:
+        usecols = [*columns, PARTITION_COL]
+    df = apply_schema(pd.read_csv(data_dir / f"{table}.csv", usecols=usecols), table)
+    if years is not None:
+        df = df[df[PARTITION_COL].isin(years)].reset_index(drop=True)
+    return df if columns is None else df[columns]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Representación compacta en memoria (análisis / entrenamiento)
+# ─────────────────────────────────────────────────────────────────────────────
+
+CATEGORY = "category"
+
+_FLOAT32 = [
+    "tmdb_popularity", "tmdb_vote_avg", "tmdb_vote_count", "tmdb_review_count",
+    "runtime_min", "imdb_rating", "imdb_votes", "metacritic", "rt_score",
+    "budget_m", "revenue_m", "log_budget", "log_revenue", "roi", "log_imdb_votes",
+    "release_month", "days_to_ceremony", "limited_before_wide",
+    "rt_norm", "imdb_norm", "metacritic_norm", "critic_composite",
+]
+
+# solo master_dataset: los montos en dólares (budget, revenue, box_office_usd)
+# e IDs quedan en float64, en float32 perderían dígitos. Categoricals solo para
+# strings de pocos valores distintos: director (casi uno por fila) queda str
+COMPACT: dict[str, str] = {
+    "ceremony_year"       : "int16",
+    "won_best_picture"    : "int8",
+    "is_q4_release"       : "int8",
+    "is_english"          : "int8",
+    "total_precursor_wins": "int16",
+    "total_precursor_noms": "int16",
+    "omdb_oscar_wins"     : "int8",
+    **{col: CATEGORY for col in ("original_language", "rated", "country",
+                                 "language", "main_language", "main_genre")},
+    **{col: "float32" for col in _FLOAT32},
+}
+COMPACT_PATTERNS = [
+    (lambda c: c.endswith("_won") or c.endswith("_nominated"), "int8"),
+    (lambda c: c.startswith("genre_"),                         "int8"),
+]
+
+
+def _compact_type(col: str) -> str | None:
+    if col in COMPACT:
+        return COMPACT[col]
+    for matches, kind in COMPACT_PATTERNS:
+        if matches(col):
+            return kind
+    return None
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Castea el master al schema compacto. Un entero con NaN o fuera de rango
+    para su tipo chico queda como estaba (con un warning) en vez de truncarse.
+    """
+    df = df.copy()
+    for col in df.columns:
+        kind = _compact_type(col)
+        if kind is None or str(df[col].dtype) == kind:
+            continue
+        values = df[col]
+        if kind.startswith("int"):
+            info = np.iinfo(kind)
+            if values.isna().any() or values.min() < info.min or values.max() > info.max:
+                log.warning(f"compact: {col} no entra en {kind}, queda {values.dtype}")
+                continue
+        df[col] = values.astype(kind)
+    return df
+
+
+def _mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def load_compact(
+    columns: list[str] | None = None,
+    years: list[int] | None = None,
+    data_dir: str | Path = DATA_DIR,
+) -> pd.DataFrame:
+    """load_table("master_dataset") con el schema compacto; loguea la memoria antes/después."""
+    df = load_table("master_dataset", columns=columns, years=years, data_dir=data_dir)
+    before = _mb(df)
+    df = compact_frame(df)
+    after = _mb(df)
+    saved = f"{(1 - after / before) * 100:.0f}% menos, " if before else ""
+    log.info(f"master_dataset en memoria: {before:.2f} MB -> {after:.2f} MB "
+             f"({saved}{len(df)} filas)")
+    return df
+
+
+def _time_load(fn, repeat: int = 5) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not _ARROW_OK:
+        raise SystemExit("pyarrow no está instalado (pip install pyarrow): solo hay CSV")
+
+    print(f"{'tabla':<18} {'filas':>6} {'csv+schema ms':>14} {'parquet ms':>11} {'speedup':>8}")
+    for table in SCHEMAS:
+        csv_path = Path(DATA_DIR) / f"{table}.csv"
+        if not csv_path.exists():
+            continue
+        df = save_table(pd.read_csv(csv_path), table)
+        csv_ms = _time_load(lambda: apply_schema(pd.read_csv(csv_path), table))
+        pq_ms  = _time_load(lambda: load_table(table))
+        print(f"{table:<18} {len(df):6d} {csv_ms:14.1f} {pq_ms:11.1f} {csv_ms / pq_ms:7.1f}x")
+
+    if table_exists("master_dataset"):
+        load_compact()
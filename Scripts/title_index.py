@@ -0,0 +1,180 @@
+"""
+Índice local título → tmdb_id armado desde el export diario de TMDB.
+
+TMDB publica cada día la lista completa de IDs de películas:
+  http://files.tmdb.org/p/exports/movie_ids_MM_DD_YYYY.json.gz
+JSONL gzippeado, una línea por film: {"id", "original_title", "popularity",
+"adult", "video"}. No trae año ni título en inglés.
+
+El índice son tres .npy alineados en data/title_index/ (se abren con
+mmap, sin cargar nada en RAM):
+  keys.npy  uint64   hash del título normalizado, ordenado
+  ids.npy   int32    tmdb_id
+  pop.npy   float32  popularidad (dentro de cada key, de mayor a menor)
+Un lookup es un searchsorted sobre keys → microsegundos por título.
+
+resolve() solo devuelve un ID cuando no hay ambigüedad (un único
+candidato, o uno que domina por popularidad); el resto cae a la API.
+
+Uso: python title_index.py --download [MM_DD_YYYY]
+     python title_index.py --dump movie_ids_10_16_2026.json.gz
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from config import DATA_DIR
+from title_match import normalize_title
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+INDEX_DIR  = Path(DATA_DIR) / "title_index"
+EXPORT_URL = "http://files.tmdb.org/p/exports/movie_ids_{date}.json.gz"
+DOMINANCE  = 20.0   # el más popular gana si supera DOMINANCE x al segundo
+
+
+def title_key(title: str) -> int:
+    """Hash 64-bit del título normalizado (title_match.normalize_title)."""
+    digest = hashlib.blake2b(normalize_title(title).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Importer
+# ─────────────────────────────────────────────────────────────────────────────
+
+def build_index(dump_path: str | Path, out_dir: str | Path = INDEX_DIR) -> int:
+    """Lee el export gzippeado y escribe keys/ids/pop.npy. Saltea adult y video."""
+    keys, ids, pops = [], [], []
+    with gzip.open(dump_path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if rec.get("adult") or rec.get("video") or not rec.get("original_title"):
+                continue
+            keys.append(title_key(rec["original_title"]))
+            ids.append(rec["id"])
+            pops.append(rec.get("popularity") or 0.0)
+
+    keys = np.array(keys, dtype=np.uint64)
+    ids  = np.array(ids, dtype=np.int32)
+    pops = np.array(pops, dtype=np.float32)
+    order = np.lexsort((-pops, keys))   # por key, y dentro de la key por popularidad desc
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "keys.npy", keys[order])
+    np.save(out_dir / "ids.npy", ids[order])
+    np.save(out_dir / "pop.npy", pops[order])
+    (out_dir / "meta.json").write_text(json.dumps({
+        "dump": Path(dump_path).name, "films": int(len(order)), "built_at": time.time(),
+    }, indent=1), encoding="utf-8")
+    log.info(f"Índice: {len(order)} films -> {out_dir}")
+    return len(order)
+
+
+def download_export(day: str | None = None, dest_dir: str | Path = INDEX_DIR) -> Path:
+    """Baja el export del día (MM_DD_YYYY; por defecto ayer, el último publicado seguro)."""
+    from http_client import get_with_retry
+
+    day  = day or (date.today() - timedelta(days=1)).strftime("%m_%d_%Y")
+    url  = EXPORT_URL.format(date=day)
+    dest = Path(dest_dir) / f"movie_ids_{day}.json.gz"
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    log.info(f"Bajando {url}")
+    dest.write_bytes(get_with_retry(url, timeout=120).content)
+    return dest
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Lookup
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TitleIndex:
+    """Lookup título → candidatos sobre los .npy mapeados. Vacío si no se construyó."""
+
+    def __init__(self, index_dir: str | Path = INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self._arrays: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    @property
+    def available(self) -> bool:
+        return (self.index_dir / "keys.npy").exists()
+
+    def _load(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = tuple(
+                np.load(self.index_dir / f"{name}.npy", mmap_mode="r")
+                for name in ("keys", "ids", "pop")
+            )
+        return self._arrays
+
+    def candidates(self, title: str) -> list[tuple[int, float]]:
+        """[(tmdb_id, popularidad)] con el mismo título normalizado, más popular primero."""
+        if not self.available:
+            return []
+        keys, ids, pops = self._load()
+        key = np.uint64(title_key(title))
+        lo, hi = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+        return [(int(i), float(p)) for i, p in zip(ids[lo:hi], pops[lo:hi])]
+
+    def resolve(self, title: str) -> int | None:
+        """tmdb_id si el título no es ambiguo en el índice; None → usar la API."""
+        cands = self.candidates(title)
+        if len(cands) == 1:
+            return cands[0][0]
+        if len(cands) > 1 and cands[0][1] >= DOMINANCE * max(cands[1][1], 1e-3):
+            return cands[0][0]
+        return None
+
+    def resolve_many(self, titles: list[str]) -> list[int | None]:
+        """resolve() vectorizado: un searchsorted para todos los títulos."""
+        if not self.available:
+            return [None] * len(titles)
+        keys, ids, pops = self._load()
+        wanted = np.array([title_key(t) for t in titles], dtype=np.uint64)
+        lo = np.searchsorted(keys, wanted, "left")
+        hi = np.searchsorted(keys, wanted, "right")
+        n  = hi - lo
+
+        out = [None] * len(titles)
+        for i in np.flatnonzero(n == 1):
+            out[i] = int(ids[lo[i]])
+        for i in np.flatnonzero(n > 1):
+            if pops[lo[i]] >= DOMINANCE * max(float(pops[lo[i] + 1]), 1e-3):
+                out[i] = int(ids[lo[i]])
+        return out
+
+
+TITLE_INDEX = TitleIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice local de títulos TMDB (export diario)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dump", help="export movie_ids_*.json.gz ya bajado")
+    source.add_argument("--download", nargs="?", const="", metavar="MM_DD_YYYY",
+                        help="bajar el export (por defecto el de ayer)")
+    args = parser.parse_args()
+
+    dump = args.dump or download_export(args.download or None)
+    build_index(dump)
+
+    from nominees_ground_truth import OSCAR_BEST_PICTURE
+    titles = [title for _, title, _ in OSCAR_BEST_PICTURE]
+    t0 = time.perf_counter()
+    resolved = TITLE_INDEX.resolve_many(titles)
+    ms = (time.perf_counter() - t0) * 1000
+    hits = sum(r is not None for r in resolved)
+    log.info(f"{hits}/{len(titles)} nominados resueltos sin API en {ms:.1f} ms "
+             f"(el resto es ambiguo → search/movie)")
@@ -0,0 +1,153 @@
+"""
+Matching de títulos a escala: normalización + índice invertido de n-gramas.
+
+  normalize_title  'The Lord of the Rings: The Return of the King' →
+                   'lord of the rings the return of the king'
+                   (sin acentos, puntuación ni artículo inicial; & → and;
+                   'Godfather, The' → 'godfather')
+  TitleMatcher     exact-key fast path (dict) y, si no hay hit exacto,
+                   fuzzy scoring solo contra el bloque de candidatos que
+                   comparten más n-gramas de caracteres con la query.
+
+Cada query junta candidatos desde sus n-gramas más raros, hasta sumar
+max_postings entradas de posting lists; los n-gramas más frecuentes que eso
+(' th', 'the', 'he ', ... en un universo grande) no se indexan. Así el costo
+por query queda acotado por max_postings + max_candidates y no crece con el
+total de títulos: matchear N contra M es ~N + M en vez de N x M. Un título
+hecho solo de n-gramas frecuentes sale igual por el fast path exacto, pero
+no tiene candidatos fuzzy.
+
+TitleMatcher es opt-in: fuzzy_match_films(blocked=True) lo usa (el build
+del master sigue con el cdist por año). fetch_tmdb y title_index comparten
+solo normalize_title, para el scoring de candidatos y las keys del índice.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Sequence
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+ARTICLES = ("the", "a", "an", "el", "la", "los", "las", "le", "les", "il", "der", "die", "das")
+NGRAM    = 3
+MAX_POSTINGS = 16384  # entradas de posting lists por query; df mayor → n-grama no indexado
+
+_PUNCT_RE   = re.compile(r"[^\w\s]")
+_SPACE_RE   = re.compile(r"\s+")
+_ARTICLE_RE = re.compile(rf"^(?:{'|'.join(ARTICLES)}) (?=\S)")
+_TRAILING_RE = re.compile(rf", (?:{'|'.join(ARTICLES)})$")
+
+
+def normalize_title(title: str) -> str:
+    """'Amélie!' / 'AMELIE' → 'amelie'; 'The Brutalist' / 'Brutalist, The' → 'brutalist'."""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _TRAILING_RE.sub("", text.lower().strip())
+    text = text.replace("&", " and ")
+    text = _PUNCT_RE.sub(" ", text).replace("_", " ")
+    text = _SPACE_RE.sub(" ", text).strip()
+    return _ARTICLE_RE.sub("", text)
+
+
+def _ngrams(key: str, n: int = NGRAM) -> set[str]:
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class TitleMatcher:
+    """
+    titles = universo contra el que se matchea (nominados, export TMDB, ...)
+    groups = int opcional por título (ceremony_year): match(..., group=g, slack=s)
+             restringe los candidatos a |groups - g| <= s
+    max_postings = presupuesto de entradas de posting lists por query (ver arriba)
+    """
+
+    def __init__(
+        self,
+        titles: Sequence[str],
+        groups: Sequence[int] | None = None,
+        max_candidates: int = 64,
+        max_postings: int = MAX_POSTINGS,
+        scorer=fuzz.token_sort_ratio,
+    ):
+        self.titles = list(titles)
+        self.keys   = [normalize_title(t) for t in self.titles]
+        self.groups = None if groups is None else np.asarray(groups, dtype=np.int64)
+        self.max_candidates = max_candidates
+        self.max_postings   = max_postings
+        self.scorer = scorer
+
+        self._exact: dict[str, list[int]] = defaultdict(list)
+        postings: dict[str, list[int]] = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            self._exact[key].append(i)
+            for gram in _ngrams(key):
+                postings[gram].append(i)
+        self._postings = {
+            g: np.array(ix, dtype=np.int64) for g, ix in postings.items() if len(ix) <= max_postings
+        }
+
+    def _in_group(self, idx: np.ndarray, group: int | None, slack: int) -> np.ndarray:
+        if group is None or self.groups is None:
+            return idx
+        return idx[np.abs(self.groups[idx] - group) <= slack]
+
+    def candidates(self, key: str, group: int | None = None, slack: int = 0) -> np.ndarray:
+        """Índices del bloque: los max_candidates que más n-gramas raros comparten con `key`."""
+        lists = sorted((self._postings[g] for g in _ngrams(key) if g in self._postings), key=len)
+        budget, n_lists = 0, 0
+        for ix in lists:
+            if budget + len(ix) > self.max_postings:
+                break
+            budget, n_lists = budget + len(ix), n_lists + 1
+        if not n_lists:
+            return np.empty(0, dtype=np.int64)
+        idx, shared = np.unique(np.concatenate(lists[:n_lists]), return_counts=True)
+        if group is not None and self.groups is not None:
+            keep = np.abs(self.groups[idx] - group) <= slack
+            idx, shared = idx[keep], shared[keep]
+        if len(idx) > self.max_candidates:
+            top = np.argpartition(-shared, self.max_candidates - 1)[:self.max_candidates]
+            idx = np.sort(idx[top])
+        return idx
+
+    def _pick(self, idx: np.ndarray, scores: np.ndarray, group: int | None) -> tuple[int, float]:
+        """Mayor score; empate → grupo más cercano → primer índice."""
+        dist = np.zeros(len(idx)) if group is None or self.groups is None else np.abs(self.groups[idx] - group)
+        best = np.lexsort((idx, dist, -scores))[0]
+        return int(idx[best]), float(scores[best])
+
+    def match(
+        self,
+        title: str,
+        threshold: float = 82,
+        group: int | None = None,
+        slack: int = 0,
+    ) -> tuple[int, float] | None:
+        """(índice en titles, score 0-100) del mejor match ≥ threshold, o None."""
+        key = normalize_title(title)
+
+        exact = self._in_group(np.array(self._exact.get(key, []), dtype=np.int64), group, slack)
+        if len(exact):
+            return self._pick(exact, np.full(len(exact), 100.0), group)
+
+        idx = self.candidates(key, group, slack)
+        if not len(idx):
+            return None
+        scores = process.cdist([key], [self.keys[i] for i in idx],
+                               scorer=self.scorer, dtype=np.float64)[0]
+        i, score = self._pick(idx, scores, group)
+        return (i, score) if score >= threshold else None
+
+    def match_many(
+        self,
+        titles: Sequence[str],
+        threshold: float = 82,
+        groups: Sequence[int] | None = None,
+        slack: int = 0,
+    ) -> list[tuple[int, float] | None]:
+        if groups is None:
+            return [self.match(t, threshold) for t in titles]
+        return [self.match(t, threshold, int(g), slack) for t, g in zip(titles, groups)]
@@ -10,6 +10,9 @@ import pandas as pd
 import plotly.graph_objects as go
 import joblib
 
+from Scripts.cohort_features import add_cohort_features
+from Scripts.feature_store import feature_matrix
+
 # ── Helpers para imágenes decorativas ────────────────────────────────────────
 try:
     from PIL import Image as _PIL
@@ -103,22 +106,44 @@ def fig_json(fig):
 # ─────────────────────────────────────────────────────────────────────────────
 # Datos
 # ─────────────────────────────────────────────────────────────────────────────
-df = pd.read_csv("data/master_dataset.csv")
+try:   # Parquet tipado (Scripts/storage.py); sin pyarrow/config cae al CSV
+    from Scripts.storage import load_table
+    df = load_table("master_dataset", data_dir="data")
+except ImportError:
+    load_table = None
+    df = pd.read_csv("data/master_dataset.csv")
 df["won_label"] = df["won_best_picture"].map({1: "Ganadora", 0: "Nominada"})
 df["decade"]    = (df["ceremony_year"] // 10) * 10
 
 # ── Parches de calidad de datos ───────────────────────────────────────────────
-# Birdman (2015): rt_score y imdb_rating incorrectos en el dataset fuente
-df.loc[(df["nominated_title"] == "Birdman") & (df["ceremony_year"] == 2015),
-       "rt_score"]   = 91.0
-df.loc[(df["nominated_title"] == "Birdman") & (df["ceremony_year"] == 2015),
-       "imdb_rating"] = 7.7
-# Crash (2006): rt_score ausente
-df.loc[(df["nominated_title"] == "Crash") & (df["ceremony_year"] == 2006),
-       "rt_score"]   = 75.0
-# ROI: calcular donde falte
-mask_roi = df["roi"].isna() & (df["budget_m"] > 0) & (df["revenue_m"] > 0)
-df.loc[mask_roi, "roi"] = df.loc[mask_roi, "revenue_m"] / df.loc[mask_roi, "budget_m"]
+def patch_master(df):
+    # Birdman (2015): rt_score y imdb_rating incorrectos en el dataset fuente
+    df.loc[(df["nominated_title"] == "Birdman") & (df["ceremony_year"] == 2015),
+           "rt_score"]   = 91.0
+    df.loc[(df["nominated_title"] == "Birdman") & (df["ceremony_year"] == 2015),
+           "imdb_rating"] = 7.7
+    # Crash (2006): rt_score ausente
+    df.loc[(df["nominated_title"] == "Crash") & (df["ceremony_year"] == 2006),
+           "rt_score"]   = 75.0
+    # ROI: calcular donde falte
+    mask_roi = df["roi"].isna() & (df["budget_m"] > 0) & (df["revenue_m"] > 0)
+    df.loc[mask_roi, "roi"] = df.loc[mask_roi, "revenue_m"] / df.loc[mask_roi, "budget_m"]
+    return df
+
+df = patch_master(df)
+
+
+def season_rows(years):
+    """
+    Filas de esas ceremonias con las features relativas al año que usa el
+    modelo. Con storage lee solo sus particiones; como las features son por
+    cohorte, calcularlas sobre esos años da lo mismo que sobre todo el master.
+    """
+    if load_table is None:
+        rows = df[df["ceremony_year"].isin(years)].copy()
+    else:
+        rows = patch_master(load_table("master_dataset", years=years, data_dir="data"))
+    return add_cohort_features(rows)
 
 winners = df[df["won_best_picture"] == 1]
 losers  = df[df["won_best_picture"] == 0]
@@ -484,14 +509,15 @@ MODEL_RESULTS    = []
 try:
     final_model  = joblib.load("models/lgbm_oscar.pkl")
     all_features = joblib.load("models/features.pkl")
-    df_test = df[df["ceremony_year"].isin(test_years_model)].copy()
+    fm = feature_matrix(season_rows(test_years_model), all_features)
     for year in test_years_model:
-        yd    = df_test[df_test["ceremony_year"] == year]
-        probs = final_model.predict_proba(yd[all_features].fillna(-999))[:, 1]
-        pn    = probs / probs.sum()
-        pred  = yd.iloc[pn.argmax()]["nominated_title"]
-        real  = yd[yd["won_best_picture"] == 1]["nominated_title"].values[0]
-        wp    = pn[yd["won_best_picture"].values == 1][0] * 100
+        titles = fm.titles(year)
+        won    = fm.labels(year) == 1
+        probs  = final_model.predict_proba(fm.frame(year))[:, 1]
+        pn     = probs / probs.sum()
+        pred   = titles[pn.argmax()]
+        real   = titles[won][0]
+        wp     = pn[won][0] * 100
         MODEL_RESULTS.append({
             "year": year, "pred": pred, "real": real,
             "correct": int(pred == real), "winner_prob": wp,
@@ -563,11 +589,12 @@ top_prob_2026 = 23.0
 try:
     final_model  = joblib.load("models/lgbm_oscar.pkl")
     all_features = joblib.load("models/features.pkl")
-    df_2026 = df[df["ceremony_year"] == 2026].copy()
+    df_2026 = season_rows([2026])
     if len(df_2026) > 0:
-        probs = final_model.predict_proba(df_2026[all_features].fillna(-999))[:, 1]
+        fm    = feature_matrix(df_2026, all_features)
+        probs = final_model.predict_proba(fm.frame())[:, 1]
         pn    = probs / probs.sum() * 100
-        rows  = sorted(zip(df_2026["nominated_title"].tolist(), pn.tolist()),
+        rows  = sorted(zip(fm.titles().tolist(), pn.tolist()),
                        key=lambda x: x[1])
         pred2026_df   = pd.DataFrame(rows, columns=["title", "prob"])
         top_film_2026 = pred2026_df.nlargest(1, "prob").iloc[0]["title"]